@@ -17,7 +17,6 @@ from docutils import nodes, utils
 from sphinx.util.nodes import split_explicit_title
 import os
 import re
-import six
 from itertools import product
 import gwgen
 
@@ -425,17 +424,14 @@ intersphinx_mapping = {
     'model_organization': (
         'http://model-organization.readthedocs.io/en/latest/', None),
 }
-if six.PY3:
-    intersphinx_mapping['python'] = ('https://docs.python.org/3.4/', None)
-else:
-    intersphinx_mapping['python'] = ('https://docs.python.org/2.7/', None)
+intersphinx_mapping['python'] = ('https://docs.python.org/3/', None)
 
 
 replacements = {}
 
 
 def link_aliases(app, what, name, obj, options, lines):
-    for (key, val), (i, line) in product(six.iteritems(replacements),
+    for (key, val), (i, line) in product(replacements.items(),
                                          enumerate(lines)):
         lines[i] = line.replace(key, val)
 
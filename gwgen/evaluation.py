@@ -2,7 +2,6 @@
 """Evaluation module of the gwgen module"""
 from __future__ import division
 import os.path as osp
-import six
 from collections import namedtuple
 from psyplot.compat.pycompat import OrderedDict
 from itertools import chain, starmap, repeat
@@ -253,7 +252,7 @@ class EvaluationPreparation(Evaluator):
                 ccday[['mean_cloud', 'wind']], left_index=True,
                 right_index=True, how='left')
         except TypeError:  # indices to not match
-            reference = cday.ix[1:0]  # create empty data frame
+            reference = cday.iloc[:0]  # create empty data frame
             reference['mean_cloud'] = np.array([],
                                                dtype=ccday.mean_cloud.dtype)
             reference['wind'] = np.array([],
@@ -269,10 +268,10 @@ class EvaluationPreparation(Evaluator):
                 ccmonth[['mean_cloud', 'wind']], left_index=True,
                 right_index=True, how='left')
             # set cloud and wind to 0 where we have no reference
-            exp_input.ix[exp_input.mean_cloud.isnull(),
-                         ['mean_cloud', 'wind']] = 0
+            exp_input.loc[exp_input.mean_cloud.isnull(),
+                          ['mean_cloud', 'wind']] = 0
         except TypeError:  # indices do not match
-            exp_input = cmonth.ix[1:0]  # create empty data frame
+            exp_input = cmonth.iloc[:0]  # create empty data frame
             exp_input['mean_cloud'] = np.array([],
                                                dtype=ccmonth.mean_cloud.dtype)
             exp_input['wind'] = np.array([],
@@ -516,16 +515,16 @@ class QuantileEvaluation(Evaluator):
             # mask out non-complete months for cloud validation and months with
             # 0 or 1 cloud fraction
             if 'mean_cloud' in names:
-                df.ix[df['mean_cloud_ref'].isnull().values |
-                      (df['mean_cloud'] == 0.0) |
-                      (df['mean_cloud'] == 1.0),
-                      ['mean_cloud_sim', 'mean_cloud_ref']] = np.nan
+                df.loc[df['mean_cloud_ref'].isnull().values |
+                       (df['mean_cloud'] == 0.0) |
+                       (df['mean_cloud'] == 1.0),
+                       ['mean_cloud_sim', 'mean_cloud_ref']] = np.nan
             # mask out non-complete wind for wind validation and months with
             # a mean wind speed of 0
             if 'wind' in names:
-                df.ix[df['wind_ref'].isnull().values | (df['wind'] == 0.0),
-                      ['wind_sim', 'wind_ref']] = np.nan
-            df.drop(['mean_cloud', 'wind'], 1, inplace=True)
+                df.loc[df['wind_ref'].isnull().values | (df['wind'] == 0.0),
+                       ['wind_sim', 'wind_ref']] = np.nan
+            df.drop(['mean_cloud', 'wind'], axis=1, inplace=True)
             df.set_index('day', append=True, inplace=True)
 
         # transform wind
@@ -533,7 +532,7 @@ class QuantileEvaluation(Evaluator):
             df['wind_ref'] **= 0.5
             df['wind_sim'] **= 0.5
         # calculate the percentiles for each station and month
-        g = df.sort_index().groupby(level=['id', 'year'])
+        g = df.groupby(level=['id', 'year'])
         data = g.apply(self.calc)
         if len(data):
             data.index = data.index.droplevel(2)
@@ -576,10 +575,10 @@ class QuantileEvaluation(Evaluator):
 
     def make_run_config(self, sp, info):
         for orig in self.names:
-            info[orig] = d = OrderedDict()
+            info[orig] = d = {}
             for plotter in sp(standard_name=orig).plotters:
                 d[plotter.data.pctl if plotter.data.name.startswith('all') else
-                  int(plotter.data.pctl.values)] = pctl_d = OrderedDict()
+                  int(plotter.data.pctl.values)] = pctl_d = {}
                 for key in ['rsquared', 'slope', 'intercept']:
                         val = plotter.plot_data[1].attrs.get(key)
                         if val is not None:
@@ -597,9 +596,9 @@ class QuantileEvaluation(Evaluator):
             else:
                 return np.percentile(arr, quantiles)
         quantiles = self.task_config.quantiles
+        all_variables = list(chain.from_iterable(self.all_variables))
         df = pd.DataFrame.from_dict(dict(zip(
-            chain(*self.all_variables), map(calc_percentiles,
-                                            chain(*self.all_variables)))))
+            all_variables, map(calc_percentiles, all_variables))))
         df['pctl'] = quantiles
         df.set_index('pctl')
         return df
@@ -688,16 +687,17 @@ class KSEvaluation(QuantileEvaluation):
         wind_sl = group.wind_ref.notnull().values
         wind_sim = group.wind_sim.values[wind_sl]
         wind_ref = group.wind_ref.values[wind_sl]
-        return pd.DataFrame.from_dict(dict(chain(*map(six.iteritems, starmap(
-            calc, [(prcp_sim, prcp_ref, 'prcp'),
-                   (tmin_sim, tmin_ref, 'tmin'),
-                   (tmax_sim, tmax_ref, 'tmax'),
-                   (cloud_sim, cloud_ref, 'mean_cloud'),
-                   (wind_sim, wind_ref, 'wind')])))))
+        return pd.DataFrame.from_dict(dict(chain.from_iterable(map(
+            dict.items, starmap(calc, [
+                (prcp_sim, prcp_ref, 'prcp'),
+                (tmin_sim, tmin_ref, 'tmin'),
+                (tmax_sim, tmax_ref, 'tmax'),
+                (cloud_sim, cloud_ref, 'mean_cloud'),
+                (wind_sim, wind_ref, 'wind')])))))
 
     def significance_fractions(self, series):
         "The percentage of stations with no significant difference"
-        return 100. - (len(series.ix[series.notnull() & (series)]) /
+        return 100. - (len(series[series.notnull() & (series)]) /
                        series.count())*100.
 
     def run(self, info):
@@ -744,7 +744,7 @@ class KSEvaluation(QuantileEvaluation):
             g.agg(dict(zip(names, repeat('sum')))), left_index=True,
             right_index=True, suffixes=['', '_sum'])
         df_lola = EvaluationPreparation.from_task(self).station_list
-        df_lola = df_lola.ix[~df_lola.duplicated('id').values]
+        df_lola = df_lola[~df_lola.duplicated('id').values]
         df_lola.set_index('id', inplace=True)
         df_plot = df_lola.merge(df_fract, how='right', left_index=True,
                                 right_index=True)
@@ -908,9 +908,9 @@ class SimulationQuality(Evaluator):
                 pass
             slope = float((1 - np.abs(1 - df.loc['slope'].values)).mean())
             rsquared = float(df.loc['rsquared'].values.mean())
-            info[v] = OrderedDict([
-                ('rsquared', rsquared), ('slope', slope), ('ks', v_ks / 100.),
-                ('quality', float(np.mean([rsquared, slope, v_ks / 100.])))])
+            info[v] = {
+                'rsquared': rsquared, 'slope': slope, 'ks': v_ks / 100.,
+                'quality': float(np.mean([rsquared, slope, v_ks / 100.]))}
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug('Simulation quality:')
             for name, val in info.items():
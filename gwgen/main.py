@@ -1,21 +1,17 @@
 from __future__ import print_function, division
 import os
 import os.path as osp
-import six
 import re
 import shutil
 import sys
 import datetime as dt
+from contextlib import suppress
 from itertools import repeat
 from argparse import Namespace, RawTextHelpFormatter
 import logging
-import numpy as np
 import gwgen.utils as utils
 from gwgen.utils import docstrings
 from model_organization import ModelOrganizer
-from model_organization.config import ordered_yaml_dump
-
-from collections import OrderedDict
 
 
 class GWGENOrganizer(ModelOrganizer):
@@ -41,11 +37,14 @@ class GWGENOrganizer(ModelOrganizer):
                        'sensitivity_analysis': 'sens',
                        'bias_correction': 'bias'}
 
-    #: list of str. The keys describing paths for the model
-    paths = ['expdir', 'src', 'data', 'param_stations', 'eval_stations',
-             'indir', 'input', 'outdir', 'outdata', 'nc_file',  'project_file',
-             'plot_file', 'reference', 'evaldir', 'paramdir', 'workdir',
-             'param_grid', 'grid', 'eval_grid']
+    #: frozenset of str. The keys describing paths for the model (a set
+    #: because :meth:`fix_paths` and :meth:`rel_paths` check every key of the
+    #: configuration against it)
+    paths = frozenset([
+        'expdir', 'src', 'data', 'param_stations', 'eval_stations', 'indir',
+        'input', 'outdir', 'outdata', 'nc_file',  'project_file', 'plot_file',
+        'reference', 'evaldir', 'paramdir', 'workdir', 'param_grid', 'grid',
+        'eval_grid'])
 
     name = 'gwgen'
 
@@ -85,14 +84,15 @@ class GWGENOrganizer(ModelOrganizer):
             module_src = self.config.projects[src_project]['src']
         else:
             module_src = osp.join(osp.dirname(__file__), 'src')
-        for f in os.listdir(module_src):
-            target = osp.join(src_dir, f)
-            if osp.exists(target):
+        existing = set(os.listdir(src_dir))
+        for entry in os.scandir(module_src):
+            target = osp.join(src_dir, entry.name)
+            if entry.name in existing:
                 os.remove(target)
             if link:
-                self._link(osp.join(module_src, f), target)
+                self._link(entry.path, target)
             else:
-                shutil.copyfile(osp.join(module_src, f), target)
+                shutil.copyfile(entry.path, target)
         compiler = compiler or self.global_config.get('compiler')
         if compiler is not None:
             with open(osp.join(src_dir, 'Makefile')) as f:
@@ -134,12 +134,13 @@ class GWGENOrganizer(ModelOrganizer):
         if not os.path.exists(bin_dir):
             self.logger.debug("    Creating bin directory %s", bin_dir)
             os.makedirs(bin_dir)
-        for f in os.listdir(src_dir):
-            self.logger.debug("    Linking %s...", f)
-            target = osp.join(bin_dir, f)
-            if osp.exists(target):
+        existing = set(os.listdir(bin_dir))
+        for entry in os.scandir(src_dir):
+            self.logger.debug("    Linking %s...", entry.name)
+            target = osp.join(bin_dir, entry.name)
+            if entry.name in existing:
                 os.remove(target)
-            self._link(osp.join(src_dir, f), target)
+            self._link(entry.path, target)
         spr.check_call(['make', '-C', bin_dir, 'all'], stdout=sys.stdout,
                        stderr=sys.stderr)
         self.logger.debug('Compilation done.')
@@ -161,7 +162,8 @@ class GWGENOrganizer(ModelOrganizer):
     @docstrings.dedent
     def configure(self, update_nml=None, max_stations=None,
                   datadir=None, database=None, user=None, host=None, port=None,
-                  chunksize=None, compiler=None, **kwargs):
+                  chunksize=None, compiler=None, start_method=None,
+                  maxtasksperchild=None, **kwargs):
         """
         Configure the projects and experiments
 
@@ -188,16 +190,28 @@ class GWGENOrganizer(ModelOrganizer):
         chunksize: int
             The chunksize to use for the parameterization and evaluation
         compiler: str
-            The path to the fortran compiler to use"""
+            The path to the fortran compiler to use
+        start_method: {'fork', 'forkserver', 'spawn'}
+            The start method of the processes that set up the
+            parameterization and evaluation tasks in parallel. By default, the
+            platform default is used. With ``'forkserver'`` and ``'spawn'``,
+            the workers do not inherit the logging configuration of the main
+            process, such that their log messages are lost
+        maxtasksperchild: int
+            The number of station lists that one process sets up before it is
+            replaced by a new one (by default, the processes live as long as
+            the pool)"""
+        if start_method is not None:
+            utils.check_start_method(start_method)
         super(GWGENOrganizer, self).configure(**kwargs)
         exp_config = self.exp_config
         if update_nml is not None:
             import f90nml
             with open(update_nml) as f:
                 ref_nml = f90nml.read(f)
-            nml2use = exp_config.setdefault('namelist', OrderedDict())
+            nml2use = exp_config.setdefault('namelist', {})
             for key, nml in ref_nml.items():
-                nml2use.setdefault(key, OrderedDict()).update(dict(nml))
+                nml2use.setdefault(key, {}).update(nml)
         gconf = self.config.global_config
         if max_stations:
             gconf['max_stations'] = max_stations
@@ -216,6 +230,10 @@ class GWGENOrganizer(ModelOrganizer):
             gconf['chunksize'] = chunksize
         if compiler is not None:
             gconf['compiler'] = compiler
+        if start_method is not None:
+            gconf['start_method'] = start_method
+        if maxtasksperchild is not None:
+            gconf['maxtasksperchild'] = maxtasksperchild
 
     def _modify_configure(self, parser):
         parser.setup_args(super(GWGENOrganizer, self).configure)
@@ -225,6 +243,8 @@ class GWGENOrganizer(ModelOrganizer):
         parser.update_arg('max_stations', short='max', type=int)
         parser.update_arg('database', short='db')
         parser.update_arg('compiler', short='c')
+        parser.update_arg('start_method', choices=list(utils.START_METHODS))
+        parser.update_arg('maxtasksperchild', type=int)
 
     # -------------------------------------------------------------------------
     # -------------------------- Preprocessing --------------------------------
@@ -259,7 +279,7 @@ class GWGENOrganizer(ModelOrganizer):
         if not osp.exists(outdir):
             os.makedirs(outdir)
 
-        preproc_config = exp_config.setdefault('preproc', OrderedDict())
+        preproc_config = exp_config.setdefault('preproc', {})
 
         for key, val in sp_kws.items():
             if isinstance(val, Namespace):
@@ -332,6 +352,7 @@ class GWGENOrganizer(ModelOrganizer):
         return ret
 
     def _select_best(self, series):
+        import numpy as np
         test_series = self._test_series
         for station in series.values:
             task = self._select_task(
@@ -431,8 +452,9 @@ class GWGENOrganizer(ModelOrganizer):
         # get inventory
         t.download_src()
         df_stations = t.station_list
+        # reset_index required due to filtering
         df_stations = df_stations[df_stations.vname == 'PRCP'].drop(
-            'vname', 1).reset_index()  # reset_index required due to filtering
+            'vname', axis=1).reset_index()
         df_stations['nyrs'] = df_stations.lastyr - df_stations.firstyr
 
         # read 1D grid information
@@ -466,11 +488,11 @@ class GWGENOrganizer(ModelOrganizer):
         df_centers.set_index(['clon', 'clat'], inplace=True)
         df_stations.set_index(['clon', 'clat'], inplace=True)
         merged = df_centers.merge(
-            df_stations.ix[indices_closest][['id']].rename(
+            df_stations.iloc[indices_closest.values][['id']].rename(
                 columns={'id': 'nearest_station'}),
             left_index=True, right_index=True, how='outer')
         merged = merged.merge(
-            df_stations.ix[indices_longest][['id']].rename(
+            df_stations.iloc[indices_longest.values][['id']].rename(
                 columns={'id': 'longest_record'}),
             left_index=True, right_index=True, how='outer')
 
@@ -480,12 +502,13 @@ class GWGENOrganizer(ModelOrganizer):
             logger.debug('Performing best station check with %s',
                          test_series.values)
             kws = dict(download=download, setup_from=setup_from)
-            if not self.global_config.get('serial'):
+            global_conf = self.global_config
+            if not global_conf.get('serial'):
                 import multiprocessing as mp
-                nprocs = self.global_config.get('nprocs', 'all')
+                nprocs = global_conf.get('nprocs', 'all')
                 lonlats = np.unique(df_stations.dropna(0).index.values)
                 if nprocs == 'all':
-                    nprocs = mp.cpu_count()
+                    nprocs = utils.cpu_count()
                 splitted = np.array_split(lonlats, nprocs)
                 try:
                     nprocs = list(map(len, splitted)).index(0)
@@ -496,14 +519,12 @@ class GWGENOrganizer(ModelOrganizer):
                 dfs = [df_stations.loc[list(arr)] for arr in splitted]
                 # initializing pool
                 logger.debug('Start %i processes', nprocs)
-                pool = mp.Pool(nprocs)
                 args = list(zip(repeat(self), dfs, repeat(test_series),
                                 repeat(kws)))
-                res = pool.map_async(self._parallel_select, args)
-                best = pd.concat(res.get())
-                pool.close()
-                pool.join()
-                pool.terminate()
+                with mp.Pool(nprocs) as pool:
+                    best = pd.concat(pool.map(self._parallel_select, args))
+                    pool.close()
+                    pool.join()
             else:
                 best = self._select_best_df(
                     df_stations.dropna(0), test_series, kws)
@@ -620,10 +641,10 @@ class GWGENOrganizer(ModelOrganizer):
             If True, setup and run all possible tasks
         """
         from gwgen.parameterization import Parameterizer
-        task_names = [task.name for task in Parameterizer._registry]
-        parameterizer_kws = {
-            key: vars(val) if isinstance(val, Namespace) else dict(val)
-            for key, val in kwargs.items() if key in task_names}
+        task_names = frozenset(
+            task.name for task in Parameterizer.get_sorted_tasks())
+        parameterizer_kws = {key: val for key, val in kwargs.items()
+                             if key in task_names}
         main_kws = {key: val for key, val in kwargs.items()
                     if key not in task_names}
         self.app_main(**main_kws)
@@ -644,11 +665,16 @@ class GWGENOrganizer(ModelOrganizer):
         manager = Parameterizer.get_manager(config=global_conf)
         self._setup_manager(manager, stations, other_exp, setup_from, to_db,
                             to_csv, database, to_return, complete,
-                            parameterizer_kws)
+                            parameterizer_kws, {experiment: exp_dict})
         # update experiment namelist and configuration
         if not norun:
-            manager.run(exp_dict.setdefault('parameterization', OrderedDict()),
-                        exp_dict.setdefault('namelist', OrderedDict()))
+            # collect the namelists of all tasks and merge them at once into
+            # the experiment configuration
+            full_nml = {}
+            manager.run(exp_dict.setdefault('parameterization', {}), full_nml)
+            exp_nml = exp_dict.setdefault('namelist', {})
+            for key, nml in full_nml.items():
+                exp_nml.setdefault(key, {}).update(nml)
         return manager
 
     def _modify_param(self, parser, *args, **kwargs):
@@ -680,12 +706,13 @@ class GWGENOrganizer(ModelOrganizer):
             that this has only an effect if `reduce_eecra` is not 0
         """
         import calendar
+        import numpy as np
         import pandas as pd
         from gwgen.parameterization import DailyGHCNData, HourlyCloud
 
         def is_complete(s):
             ndays = 366 if calendar.isleap(s.name[1]) else 365
-            s[:] = s.ix[~s.index.duplicated()].count() == ndays
+            s[:] = s[~s.index.duplicated()].count() == ndays
             return s
 
         stations = self._get_stations(stations)
@@ -732,7 +759,7 @@ class GWGENOrganizer(ModelOrganizer):
                             df_bool[col] = df_bool[col].astype(bool)
                         g = df_bool.groupby(level=['station_id', 'year'])
                         mask = g.transform(is_complete).values.any(axis=1)
-                        df = df.ix[mask]
+                        df = df[mask]
 
                     g = df.groupby(['station_id', 'year'],
                                    as_index=False)
@@ -742,7 +769,7 @@ class GWGENOrganizer(ModelOrganizer):
                     self.logger.debug(
                         'Saving EECRA test sample with %i years from %i to '
                         '%s', n, tot, target)
-                    df.ix[1:0].to_csv(target, index=False)
+                    df.iloc[:0].to_csv(target, index=False)
                     igrp = next(idx_groups)
                     for i, (key, group) in enumerate(g):
                         if i == igrp:
@@ -819,24 +846,24 @@ class GWGENOrganizer(ModelOrganizer):
         exp_config['indir'] = osp.dirname(ifile)
         exp_config['workdir'] = work_dir
         nml = exp_config.setdefault(
-            'namelist', {'weathergen_ctl': OrderedDict(),
-                         'main_ctl': OrderedDict()})
+            'namelist', {'weathergen_ctl': {}, 'main_ctl': {}})
         for key in ['weathergen_ctl', 'main_ctl']:
             nml.setdefault(key, {})
 
-        if osp.exists(work_dir) and remove:
-            shutil.rmtree(work_dir)
-        elif not osp.exists(work_dir):
-            os.makedirs(work_dir)
-        if not osp.exists(odir):
-            os.makedirs(odir)
+        if remove:
+            with suppress(FileNotFoundError):
+                shutil.rmtree(work_dir)
+        os.makedirs(work_dir, exist_ok=True)
+        os.makedirs(odir, exist_ok=True)
 
         f = project_config['bin']
         target = osp.join(work_dir, osp.basename(f))
         logger.debug('Copy executable %s to %s', f, target)
         shutil.copyfile(f, target)
         os.chmod(target, stat.S_IWUSR | stat.S_IXUSR | stat.S_IRUSR)
-        logger.debug('    Name list: %s', ordered_yaml_dump(nml))
+        if logger.isEnabledFor(logging.DEBUG):
+            from model_organization.config import ordered_yaml_dump
+            logger.debug('    Name list: %s', ordered_yaml_dump(nml))
         with open(osp.join(work_dir, 'weathergen.nml'), 'w') as f:
             f90nml.write(nml, f)
 
@@ -886,10 +913,10 @@ class GWGENOrganizer(ModelOrganizer):
         ----------
         %(GWGENOrganizer.param.parameters)s"""
         from gwgen.evaluation import Evaluator
-        task_names = [task.name for task in Evaluator._registry]
-        evaluator_kws = {
-            key: vars(val) if isinstance(val, Namespace) else dict(val)
-            for key, val in kwargs.items() if key in task_names}
+        task_names = frozenset(
+            task.name for task in Evaluator.get_sorted_tasks())
+        evaluator_kws = {key: val for key, val in kwargs.items()
+                         if key in task_names}
         main_kws = {key: val for key, val in kwargs.items()
                     if key not in task_names}
         self.app_main(**main_kws)
@@ -910,10 +937,10 @@ class GWGENOrganizer(ModelOrganizer):
         manager = Evaluator.get_manager(config=global_conf)
         self._setup_manager(manager, stations, other_exp, setup_from, to_db,
                             to_csv, database, to_return, complete,
-                            evaluator_kws)
+                            evaluator_kws, {experiment: exp_dict})
         # update experiment namelist and configuration
         if not norun:
-            manager.run(exp_dict.setdefault('evaluation', OrderedDict()))
+            manager.run(exp_dict.setdefault('evaluation', {}))
         return manager
 
     def _modify_evaluate(self, parser, *args, **kwargs):
@@ -974,8 +1001,8 @@ class GWGENOrganizer(ModelOrganizer):
                             'nc_output': quants_output + '.nc'}
         self.evaluate(**kwargs)
 
-        d = self.exp_config.setdefault('postproc', OrderedDict()).setdefault(
-            'bias', OrderedDict())
+        d = self.exp_config.setdefault('postproc', {}).setdefault(
+            'bias', {})
 
         d['plot_file'] = quants_output + '.pdf'
         d['project_file'] = quants_output + '.pkl'
@@ -1075,8 +1102,8 @@ class GWGENOrganizer(ModelOrganizer):
         ds = xr.Dataset.from_dataframe(df)
 
         # --- plots
-        d = self.exp_config.setdefault('postproc', OrderedDict()).setdefault(
-            'bias', OrderedDict()).setdefault(vname, OrderedDict())
+        d = self.exp_config.setdefault('postproc', {}).setdefault(
+            'bias', {}).setdefault(vname, {})
         plot_output = plot_output or d.get('plot_output')
         if plot_output is None:
             plot_output = osp.join(
@@ -1189,8 +1216,8 @@ class GWGENOrganizer(ModelOrganizer):
         ds = xr.Dataset.from_dataframe(df)
 
         # --- plots
-        d = self.exp_config.setdefault('postproc', OrderedDict()).setdefault(
-            'bias', OrderedDict()).setdefault(vname, OrderedDict())
+        d = self.exp_config.setdefault('postproc', {}).setdefault(
+            'bias', {}).setdefault(vname, {})
         plot_output = plot_output or d.get('plot_output')
         if plot_output is None:
             plot_output = osp.join(
@@ -1253,12 +1280,12 @@ class GWGENOrganizer(ModelOrganizer):
         others
         """
         from gwgen.sensitivity_analysis import SensitivityAnalysis
-        sa_func_map = OrderedDict([
-            ('setup', 'setup'), ('compile', 'compile_model'),
-            ('init', 'init'), ('run', 'run'), ('evaluate', 'evaluate'),
-            ('plot', 'plot'), ('remove', 'remove')])
-        sensitivity_kws = OrderedDict(
-            (key, kwargs[key]) for key in sa_func_map if key in kwargs)
+        sa_func_map = {
+            'setup': 'setup', 'compile': 'compile_model', 'init': 'init',
+            'run': 'run', 'evaluate': 'evaluate', 'plot': 'plot',
+            'remove': 'remove'}
+        sensitivity_kws = {
+            key: kwargs[key] for key in sa_func_map if key in kwargs}
         main_kws = {
             key: kwargs[key] for key in set(kwargs).difference(sa_func_map)}
         self.app_main(**main_kws)
@@ -1349,9 +1376,7 @@ class GWGENOrganizer(ModelOrganizer):
                       metavar='indicator[,indicator[,...]]',
                       default=defaults.indicators)
         sp.update_arg('meta', metavar='<yaml-file>')
-        tasks = utils.unique_everseen(
-            SensitivityPlot.get_manager().sort_by_requirement(
-                SensitivityPlot._registry[::-1]), lambda t: t.name)
+        tasks = SensitivityPlot.get_sorted_tasks()
         plot_sps = sp.add_subparsers(help='Plotting tasks', chain=True)
         for task in tasks:
             plot_sp = plot_sps.add_parser(task.name, help=task.summary)
@@ -1369,6 +1394,48 @@ class GWGENOrganizer(ModelOrganizer):
     # ------------------------------ Miscallaneous ----------------------------
     # -------------------------------------------------------------------------
 
+    @staticmethod
+    def _load_stations(fname):
+        """Load the station ids from the first column of `fname`
+
+        Parameters
+        ----------
+        fname: str
+            The path to a whitespace separated table with the station ids in
+            the first column
+
+        Returns
+        -------
+        np.ndarray
+            The unicode array of station ids"""
+        import numpy as np
+        import pandas as pd
+        return pd.read_csv(
+            fname, sep=r'\s+', header=None, usecols=[0], dtype=str,
+            comment='#', memory_map=True).iloc[:, 0].values.astype(np.str_)
+
+    @staticmethod
+    def _save_stations(fname, stations):
+        """Save the station ids to `fname`, one per line
+
+        The file is not rewritten if it already contains the given stations
+
+        Parameters
+        ----------
+        fname: str
+            The path of the output file
+        stations: list of str
+            The station ids to save"""
+        content = ''.join('%s\n' % station for station in stations)
+        try:
+            with open(fname) as f:
+                if f.read() == content:
+                    return
+        except FileNotFoundError:
+            pass
+        with open(fname, 'w') as f:
+            f.write(content)
+
     def _get_stations(self, stations, other_exp=False, odir=None,
                       config_key=None):
         """
@@ -1387,14 +1454,12 @@ class GWGENOrganizer(ModelOrganizer):
             The key in the :attr:`exp_config` configuration dictionary holding
             information on the stations
         """
-        import numpy as np
-
         exp_dict = self.exp_config
         fname = osp.join(odir, 'stations.dat') if odir else ''
         if other_exp and stations is None:
             stations = self.fix_paths(
                 self.config.experiments[other_exp]).get(config_key)
-        if isinstance(stations, six.string_types):
+        if isinstance(stations, str):
             stations = [stations]
         if stations is None:
             try:
@@ -1402,9 +1467,7 @@ class GWGENOrganizer(ModelOrganizer):
             except KeyError:
                 raise ValueError('No stations file specified!')
             else:
-                stations = np.loadtxt(exp_dict[config_key],
-                                      dtype='S300', usecols=[0]).astype(
-                    np.str_)
+                stations = self._load_stations(fname)
         elif len(stations) == 1 and osp.exists(stations[0]):
             fname_use = stations[0]
             exists = osp.exists(fname) if fname else False
@@ -1413,19 +1476,23 @@ class GWGENOrganizer(ModelOrganizer):
                 self._link(fname_use, fname)
             elif not exists and fname:
                 self._link(fname_use, fname)
-            stations = np.loadtxt(
-                fname_use, dtype='S300', usecols=[0]).astype(np.str_)
+            stations = self._load_stations(fname_use)
         elif len(stations) and fname:
-            np.savetxt(fname, stations, fmt='%s')
+            self._save_stations(fname, stations)
         if config_key and (not exp_dict.get(config_key) or not osp.samefile(
                 fname, exp_dict[config_key])):
             exp_dict[config_key] = fname
         return stations
 
+    #: frozenset of str. Keywords of the task subparsers that are handled by
+    #: :meth:`_setup_manager` and not passed to the tasks
+    _no_task_kws = frozenset(['stations', 'complete', 'norun', 'other_id',
+                              'database', 'other_exp'])
+
     def _setup_manager(
             self, manager, stations=None, other_exp=None,
             setup_from=None, to_db=None, to_csv=None, database=None,
-            to_return=None, complete=False, base_kws={}):
+            to_return=None, complete=False, base_kws=None, exp_configs=None):
         """
         Setup the data in a task manager
 
@@ -1460,39 +1527,56 @@ class GWGENOrganizer(ModelOrganizer):
             If True, setup and run all possible tasks
         base_kws: dict
             The dictionary with mapping from each task name to the
-            corresponding initialization keywords
+            corresponding initialization keywords (a dictionary or the
+            :class:`argparse.Namespace` of the task subparser). The keywords
+            of the tasks are not modified by this method
+        exp_configs: dict
+            A mapping from experiment name to the experiment configuration
+            that has already been processed by the :meth:`fix_paths` method.
+            Experiments in here are not processed again
         """
+        if base_kws is None:
+            base_kws = {}
         if complete:
             for task in manager.base_task._registry:
                 base_kws.setdefault(task.name, {})
         experiment = self.experiment
-        exp_dict = self.fix_paths(self.config.experiments[experiment])
+        # the (path-fixed) configurations of the used experiments
+        exp_configs = dict(exp_configs or {})
+        exp_dict = exp_configs.get(experiment)
+        if exp_dict is None:
+            exp_configs[experiment] = exp_dict = self.fix_paths(
+                self.config.experiments[experiment])
         if database is not None:
             exp_dict['database'] = database
         # setup up the keyword arguments for the parameterization tasks
-        for key, d in base_kws.items():
-            if d.get('setup_from') is None:
-                d['setup_from'] = setup_from
-            if to_csv:
-                d['to_csv'] = to_csv
-            elif to_csv is None and d.get('to_csv') is None:
-                # delete the argument if the subparser doesn't use it
-                d.pop('to_csv', None)
-            if to_db:
-                # delete the argument if the subparser doesn't use it
-                d['to_db'] = to_db
-            elif to_db is None and d.get('to_db') is None:
-                d.pop('to_db', None)
-            if other_exp and not d.get('other_exp'):
-                d['other_exp'] = other_exp
-            exp = d.pop('other_exp', experiment) or experiment
-            d['config'] = self.fix_paths(self.config.experiments[exp])
-            d['project_config'] = self.config.projects[d['config']['project']]
-            for key in ['stations', 'complete', 'norun', 'other_id',
-                        'database']:
-                d.pop(key, None)
+        task_kws = {}
+        output_kws = [('to_csv', to_csv), ('to_db', to_db)]
+        for name, d in base_kws.items():
+            if isinstance(d, Namespace):
+                d = vars(d)
+            exp = d.get('other_exp') or other_exp or experiment
+            kws = {key: val for key, val in d.items()
+                   if key not in self._no_task_kws}
+            # the subparsers set `setup_from` to None if not given, so
+            # setdefault is not sufficient here
+            if kws.get('setup_from') is None:
+                kws['setup_from'] = setup_from
+            for key, val in output_kws:
+                if val:
+                    kws[key] = val
+                elif val is None and kws.get(key) is None:
+                    # delete the argument if the subparser doesn't use it
+                    kws.pop(key, None)
+            config = exp_configs.get(exp)
+            if config is None:
+                exp_configs[exp] = config = self.fix_paths(
+                    self.config.experiments[exp])
+            kws['config'] = config
+            kws['project_config'] = self.config.projects[config['project']]
+            task_kws[name] = kws
         # choose keywords for data processing
-        manager.initialize_tasks(stations, task_kws=base_kws)
+        manager.initialize_tasks(stations, task_kws=task_kws)
         manager.setup(stations, to_return=to_return)
 
     def _modify_task_parser(self, parser, base_task, skip=None, only=None):
@@ -1530,21 +1614,52 @@ class GWGENOrganizer(ModelOrganizer):
                 'separated list of parameterization tasks for which to only '
                 'setup the data'), metavar='task1,task2,...')
         doc = docstrings.params['GWGENOrganizer.param.parameters']
-        setup_from_doc, setup_from_dtype = parser.get_param_doc(
-            doc, 'setup_from')
-        other_exp_doc, other_exp_dtype = parser.get_param_doc(doc, 'other_exp')
+        other_exp_doc, other_exp_dtype = self._get_param_doc(
+            parser, doc, 'other_exp')
+        # the keywords that are the same for all task parsers
+        other_id_kws = dict(help=other_exp_doc, metavar=other_exp_dtype)
+        sp_kws = dict(formatter_class=RawTextHelpFormatter)
 
-        tasks = filter(key_func, utils.unique_everseen(
-            base_task.get_manager().sort_by_requirement(
-                base_task._registry[::-1]), lambda t: t.name))
+        tasks = filter(key_func, base_task.get_sorted_tasks())
         sps = parser.add_subparsers(title='Tasks', chain=True)
         for task in tasks:
-            sp = sps.add_parser(task.name, help=task.summary,
-                                formatter_class=RawTextHelpFormatter)
+            sp = sps.add_parser(task.name, help=task.summary, **sp_kws)
             task._modify_parser(sp)
-            sp.add_argument(
-                '-ido', '--other_id', help=other_exp_doc,
-                metavar=other_exp_dtype)
+            sp.add_argument('-ido', '--other_id', **other_id_kws)
+
+    #: dict. Cache for the parameter documentations that are extracted by the
+    #: :meth:`_get_param_doc` method
+    _param_docs = {}
+
+    @classmethod
+    def _get_param_doc(cls, parser, doc, param):
+        """Get the documentation and data type of a parameter
+
+        This method caches the results of the `get_param_doc` method of the
+        given `parser` such that the docstring is only parsed once, no matter
+        how many parsers are created
+
+        Parameters
+        ----------
+        parser: funcargparse.FuncArgParser
+            The parser to use for extracting the documentation
+        doc: str
+            The parameters section of a docstring
+        param: str
+            The name of the parameter in `doc`
+
+        Returns
+        -------
+        str
+            The documentation of `param`
+        str
+            The data type of `param`"""
+        key = (doc, param)
+        try:
+            return cls._param_docs[key]
+        except KeyError:
+            ret = cls._param_docs[key] = parser.get_param_doc(doc, param)
+            return ret
 
     def _link(self, source, target):
         """Link two files
@@ -1586,6 +1701,7 @@ def logistic_function(x, L, k, x0):
     -------
     np.ndarray
         The calculated :math:`f(x)`"""
+    import numpy as np
     return L / (1 + np.exp(-k * (x - x0)))
 
 
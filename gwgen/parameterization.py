@@ -5,19 +5,60 @@ import os.path as osp
 import tempfile
 import datetime as dt
 import textwrap
-import six
-from functools import partial
 from collections import namedtuple
-import inspect
+from functools import lru_cache
 import subprocess as spr
-from itertools import product
+from itertools import product, chain, repeat
 import pandas as pd
 import numpy as np
-import calendar
 import gwgen.utils as utils
 from gwgen.utils import docstrings
+from gwgen.parseghcnrow import _days_in_month
 from psyplot.compat.pycompat import OrderedDict, filterfalse
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _kernel_array(arr):
+    """Convert an array for the numba kernels of this module
+
+    numba compiles a kernel for every combination of dtype, dimension, memory
+    layout and writeability of its arguments. We therefore pass only
+    writeable C-contiguous float64 arrays such that each kernel is compiled
+    (or loaded from the cache) only once per process
+
+    Parameters
+    ----------
+    arr: np.ndarray
+        The input array
+
+    Returns
+    -------
+    np.ndarray
+        `arr` as C-contiguous float64 array (without copy, if possible)"""
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    if not arr.flags.writeable:  # e.g. read-only views of a DataFrame
+        arr = arr.copy()
+    return arr
+
+
+def _plotters_by_name(sp):
+    """Map the variable names in a project to their plotters
+
+    Parameters
+    ----------
+    sp: psyplot.project.Project
+        The project with the plots
+
+    Returns
+    -------
+    dict
+        A mapping from the name of the plotted variable to the plotter"""
+    return {plotter.data.name: plotter for plotter in sp.plotters}
+
 
 def _requirement_property(requirement):
 
@@ -28,6 +69,481 @@ def _requirement_property(requirement):
         get_x, doc=requirement + " parameterization instance")
 
 
+def _count_transitions(vals):
+    """Count the wet and dry day transitions in one pass over `vals`
+
+    This function is compiled with numba (if available) and used by the
+    :meth:`MarkovChain.calc_ndays` method
+
+    Parameters
+    ----------
+    vals: np.ndarray
+        The 1D float array of daily precipitation
+
+    Returns
+    -------
+    tuple of int
+        ``n, nwet, ndry, np11, np01, np001, np001_denom, np101, np101_denom``
+        (see :meth:`MarkovChain.calc_ndays`)"""
+    n = len(vals)
+    nwet = ndry = np11 = np01 = 0
+    np001 = np001_denom = np101 = np101_denom = 0
+    for i in range(n - 1):
+        wet = vals[i] > 0.0
+        dry = vals[i] == 0.0
+        wet1 = vals[i + 1] > 0.0
+        if wet:
+            nwet += 1
+            if wet1:
+                np11 += 1
+        elif dry:
+            ndry += 1
+            if wet1:
+                np01 += 1
+        if i < n - 2 and vals[i + 1] == 0.0:
+            wet2 = vals[i + 2] > 0.0
+            dry2 = vals[i + 2] == 0.0
+            if wet and (wet2 or dry2):
+                np101_denom += 1
+                if wet2:
+                    np101 += 1
+            elif dry and (wet2 or dry2):
+                np001_denom += 1
+                if wet2:
+                    np001 += 1
+    return (n, nwet, ndry, np11, np01, np001, np001_denom, np101,
+            np101_denom)
+
+
+if njit is not None:
+    _count_transitions = njit(cache=True)(_count_transitions)
+
+
+#: The statistics that are computed by :func:`_monthly_temperature_props` and
+#: :meth:`TemperatureParameterizer.calc_monthly_props`
+_temperature_props = [
+    'tmin_wet', 'tmax_wet', 'tminstddev_wet', 'tmaxstddev_wet', 'trange_wet',
+    'trangestddev_wet', 'tmin_dry', 'tmax_dry', 'tminstddev_dry',
+    'tmaxstddev_dry', 'trange_dry', 'trangestddev_dry', 'tmin', 'tmax',
+    'tminstddev', 'tmaxstddev', 'trange', 'trangestddev', 't', 'tstddev',
+    'prcp_wet', 'alpha', 'beta']
+
+
+def _update_stats(stats, j, x):
+    """Add `x` to the running statistics of channel `j`
+
+    This function implements Welford's algorithm for the count
+    (``stats[0, j]``), the mean (``stats[1, j]``) and the sum of the squared
+    deviations from the mean (``stats[2, j]``)"""
+    stats[0, j] += 1
+    delta = x - stats[1, j]
+    stats[1, j] += delta / stats[0, j]
+    stats[2, j] += delta * (x - stats[1, j])
+
+
+def _monthly_temperature_props(prcp, tmin, tmax, starts):
+    """Calculate the temperature statistics of multiple months
+
+    This function is compiled with numba (if available) and computes the
+    same as :meth:`TemperatureParameterizer.calc_monthly_props` for all
+    months at once with one pass through the data of each month
+
+    Parameters
+    ----------
+    prcp, tmin, tmax: np.ndarray
+        The 1D float arrays of the daily data, sorted by month
+    starts: np.ndarray
+        The index of the first day of each month in the data arrays, followed
+        by the length of the arrays
+
+    Returns
+    -------
+    np.ndarray
+        The ``(len(starts) - 1, len(_temperature_props))`` array of the
+        statistics (in the order of :data:`_temperature_props`). Months where
+        the arithmetic and geometric mean of the precipitation are equal are
+        NaN"""
+    nmonths = len(starts) - 1
+    out = np.empty((nmonths, 23))
+    # the statistics of tmin, tmax and tmax - tmin on wet days (channels 0-2)
+    # and on dry days (3-5), of tmin, tmax, tmin - tmax and the mean
+    # temperature on all days (6-9) and of prcp and log(prcp) on wet days
+    # (10-11)
+    stats = np.zeros((3, 12))
+    for i in range(nmonths):
+        stats[:] = 0.0
+        for k in range(starts[i], starts[i + 1]):
+            p = prcp[k]
+            tn = tmin[k]
+            tx = tmax[k]
+            if p > 0.0:
+                _update_stats(stats, 0, tn)
+                _update_stats(stats, 1, tx)
+                _update_stats(stats, 2, tx - tn)
+                _update_stats(stats, 10, p)
+                _update_stats(stats, 11, np.log(p))
+            elif p == 0.0:
+                _update_stats(stats, 3, tn)
+                _update_stats(stats, 4, tx)
+                _update_stats(stats, 5, tx - tn)
+            _update_stats(stats, 6, tn)
+            _update_stats(stats, 7, tx)
+            _update_stats(stats, 8, tn - tx)
+            _update_stats(stats, 9, (tn + tx) * 0.5)
+        n = stats[0]
+        means = np.where(n > 0, stats[1], np.nan)
+        stds = np.sqrt(stats[2] / n)
+        am = means[10]  # arithmetic mean
+        gm = np.exp(means[11])  # geometric mean
+        if am == gm:
+            out[i, :] = np.nan
+            continue
+        row = out[i]
+        for j in range(2):
+            row[j * 6] = means[j * 3]
+            row[j * 6 + 1] = means[j * 3 + 1]
+            row[j * 6 + 2] = stds[j * 3]
+            row[j * 6 + 3] = stds[j * 3 + 1]
+            row[j * 6 + 4] = means[j * 3 + 2]
+            row[j * 6 + 5] = stds[j * 3 + 2]
+        row[12] = means[6]
+        row[13] = means[7]
+        row[14] = stds[6]
+        row[15] = stds[7]
+        row[16] = means[8]
+        row[17] = stds[8]
+        row[18] = means[9]
+        row[19] = stds[9]
+        row[20] = am
+        t = np.log(am / gm)
+        row[21] = alpha = 0.5000876 / t + 0.16488552 - 0.0544274 * t
+        row[22] = am / alpha
+    return out
+
+
+if njit is not None:
+    _update_stats = njit(cache=True)(_update_stats)
+    # use the numpy error model to get NaN for the statistics of empty
+    # channels
+    _monthly_temperature_props = njit(cache=True, error_model='numpy')(
+        _monthly_temperature_props)
+
+
+#: Lookup table for the present weather codes (``ww``) that indicate
+#: precipitation
+_wet_ww = np.zeros(100, dtype=bool)
+_wet_ww[50:76] = True
+_wet_ww[[77, 79]] = True
+_wet_ww[80:100] = True
+
+
+def _daily_cloud_props(ww, at, n, ws, starts):
+    """Calculate the daily summaries of hourly cloud data
+
+    This function is compiled with numba (if available) and computes the
+    same as :meth:`DailyCloud.calculate_daily` for all days at once
+
+    Parameters
+    ----------
+    ww, at, n, ws: np.ndarray
+        The 1D float arrays of the hourly present weather, air temperature,
+        total cloud cover and wind speed, sorted by day
+    starts: np.ndarray
+        The index of the first hour of each day in the data arrays, followed
+        by the length of the arrays
+
+    Returns
+    -------
+    np.ndarray
+        The ``(len(starts) - 1, 5)`` array with the wet day flag, the minimum
+        and maximum temperature, the mean cloud fraction and the mean wind
+        speed of each day. Missing values are ignored"""
+    ndays = len(starts) - 1
+    nww = len(_wet_ww)
+    out = np.empty((ndays, 5))
+    for i in range(ndays):
+        wet = 0.0
+        tmin = tmax = np.nan
+        cloud = wind = 0.0
+        ncloud = nwind = 0
+        for k in range(starts[i], starts[i + 1]):
+            # missing weather codes (-1 or NaN) are not wet
+            if ww[k] >= 0 and ww[k] < nww and _wet_ww[int(ww[k])]:
+                wet = 1.0
+            t = at[k]
+            if not np.isnan(t):
+                if not t >= tmin:  # True as well if tmin is NaN
+                    tmin = t
+                if not t <= tmax:
+                    tmax = t
+            if not np.isnan(n[k]):
+                cloud += n[k]
+                ncloud += 1
+            if not np.isnan(ws[k]):
+                wind += ws[k]
+                nwind += 1
+        out[i, 0] = wet
+        out[i, 1] = tmin
+        out[i, 2] = tmax
+        out[i, 3] = cloud / ncloud / 8.
+        out[i, 4] = wind / nwind
+    return out
+
+
+if njit is not None:
+    # use the numpy error model to get NaN for days without valid values
+    _daily_cloud_props = njit(cache=True, error_model='numpy')(
+        _daily_cloud_props)
+
+
+def _group_means(codes, vals, ngroups):
+    """Compute the NaN-ignoring mean of each column for groups of rows
+
+    Parameters
+    ----------
+    codes: np.ndarray of int
+        The group of each row in `vals` (between 0 and `ngroups` - 1)
+    vals: np.ndarray
+        The 2D float array with the values
+    ngroups: int
+        The number of groups
+
+    Returns
+    -------
+    np.ndarray
+        The ``(ngroups, vals.shape[1])`` array with the means"""
+    ncols = vals.shape[1]
+    sums = np.zeros((ngroups, ncols))
+    counts = np.zeros((ngroups, ncols))
+    for i in range(len(codes)):
+        c = codes[i]
+        for j in range(ncols):
+            v = vals[i, j]
+            if not np.isnan(v):
+                sums[c, j] += v
+                counts[c, j] += 1
+    return sums / counts
+
+
+if njit is not None:
+    _group_means = njit(cache=True, error_model='numpy')(_group_means)
+
+
+def _group_starts(index, levels):
+    """Get the positions where a new group starts in a sorted index
+
+    Parameters
+    ----------
+    index: pandas.MultiIndex
+        The sorted index
+    levels: list of str
+        The levels in `index` that define the groups
+
+    Returns
+    -------
+    np.ndarray
+        The position of the first element of each group, followed by the
+        length of `index`"""
+    if not len(index):
+        return np.zeros(1, dtype=np.intp)
+    new_group = np.logical_or.reduce([
+        key[1:] != key[:-1] for key in map(index.get_level_values, levels)])
+    return np.flatnonzero(np.r_[True, new_group, True])
+
+
+def _sorted_level_codes(index, level):
+    """Get the codes of a level in a multi index with respect to sorted values
+
+    Parameters
+    ----------
+    index: pandas.MultiIndex
+        The index
+    level: str
+        The name of the level in `index`
+
+    Returns
+    -------
+    np.ndarray
+        The code of each element in `index`
+    np.ndarray
+        The sorted values of the level such that the codes index them"""
+    i = index.names.index(level)
+    codes = np.asarray(index.codes[i])
+    values = index.levels[i].values
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(order))
+    return ranks[codes], values[order]
+
+
+def _eecra_ghcn_map_file(data_dir=None):
+    """Get the path to the csv file mapping GHCN ids to EECRA stations
+
+    Parameters
+    ----------
+    data_dir: str
+        The data directory of the task. If it does not contain a
+        ``'eecra_ghcn_map.csv'`` file (or is None), the file shipped with
+        gwgen is used
+
+    Returns
+    -------
+    str
+        The path to the csv file"""
+    if data_dir is not None:
+        fname = osp.join(data_dir, 'eecra_ghcn_map.csv')
+        if osp.exists(fname):
+            return fname
+    return osp.join(osp.dirname(__file__), 'data', 'eecra_ghcn_map.csv')
+
+
+@lru_cache(maxsize=None)
+def _read_eecra_ghcn_map(fname):
+    """Read the mapping from GHCN id to EECRA station_id
+
+    The result is cached, such that each file is only read once per process
+    and must therefore not be modified
+
+    Parameters
+    ----------
+    fname: str
+        The path to the csv file
+
+    Returns
+    -------
+    pandas.DataFrame
+        The ``'station_id'`` and ``'dist'`` for each GHCN ``'id'``"""
+    return pd.read_csv(fname, index_col='id')
+
+
+@lru_cache(maxsize=None)
+def _read_eecra_ghcn_dict(fname):
+    """Read the mapping from GHCN id to EECRA station_id into a dictionary
+
+    Parameters
+    ----------
+    fname: str
+        The path to the csv file
+
+    Returns
+    -------
+    dict
+        The mapping from GHCN ``'id'`` to the integer ``'station_id'`` (for
+        the stations with complete information only)"""
+    df = _read_eecra_ghcn_map(fname).dropna()
+    return dict(zip(df.index.values, df.station_id.values.astype(int)))
+
+
+def _complete_mask(df, cols):
+    """Get the rows where all the given completeness flags are True
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        The data frame with the boolean columns
+    cols: list of str
+        The boolean columns in `df` that have to be True
+
+    Returns
+    -------
+    np.ndarray
+        The 1D boolean mask for the rows of `df`"""
+    return np.logical_and.reduce([df[col].values for col in cols])
+
+
+def _bool_complete_cols(df):
+    """Convert the completeness flags of a data frame to boolean columns
+
+    The database returns the ``BOOLEAN`` columns as 64-bit integers, this
+    function converts them back to 1-byte booleans (inplace)
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        The data frame with the ``'complete'`` columns"""
+    for col in df.columns:
+        if 'complete' in col and df[col].dtype != bool:
+            df[col] = df[col].astype(bool)
+
+
+def _complete_years(df, cols):
+    """Get the completeness of the years of monthly data
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        The monthly data with an index with ``'id'`` and ``'year'`` levels
+    cols: list of str
+        The boolean columns in `df` that mark the complete months
+
+    Returns
+    -------
+    pandas.DataFrame
+        A boolean frame with the index of `df` and one ``col + '_year'``
+        column for each `col` in `cols` that is True if the column is complete
+        in all 12 months of the year"""
+    # count the complete months of each station and year directly from the
+    # boolean columns, without copying them into a new frame for a groupby
+    id_codes, ids = _sorted_level_codes(df.index, 'id')
+    year_codes, years = _sorted_level_codes(df.index, 'year')
+    keys = id_codes * len(years) + year_codes
+    n = len(ids) * len(years)
+    return pd.DataFrame(OrderedDict(
+        (col + '_year', np.bincount(keys, df[col].values, n)[keys] == 12)
+        for col in cols), index=df.index)
+
+
+def _add_complete_years(df, cols):
+    """Add the completeness of the years to monthly data
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        The monthly data with an index with ``'id'`` and ``'year'`` levels
+    cols: list of str
+        The boolean columns in `df` that mark the complete months
+
+    Returns
+    -------
+    pandas.DataFrame
+        `df` with the columns of :func:`_complete_years`"""
+    return pd.concat([df, _complete_years(df, cols)], axis=1)
+
+
+def _genpareto_pwm(arr, thresh):
+    """Estimate the generalized pareto parameters with probability weighted
+    moments
+
+    This closed form estimator of Hosking and Wallis (Technometrics, 29,
+    339-349, 1987) is used as a starting point for the maximum likelihood
+    fit of :func:`scipy.stats.genpareto.fit`
+
+    Parameters
+    ----------
+    arr: np.ndarray
+        The sorted (ascending) values above `thresh`
+    thresh: float
+        The location of the distribution
+
+    Returns
+    -------
+    tuple of floats or None
+        The shape and scale parameter (following the conventions of
+        :data:`scipy.stats.genpareto`) or None if they do not describe a
+        distribution whose support contains all values in `arr`"""
+    x = arr - thresh
+    n = len(x)
+    b0 = x.mean()
+    b1 = (x * np.arange(n - 1, -1, -1)).sum() / (n * (n - 1))
+    if b0 == 2 * b1:
+        return None
+    shape = 2 - b0 / (b0 - 2 * b1)
+    scale = b0 * (1 - shape)
+    if scale <= 0 or (shape < 0 and x[-1] >= -scale / shape):
+        return None
+    return shape, scale
+
+
 class Parameterizer(utils.TaskBase):
     """Base class for parameterization tasks"""
 
@@ -64,11 +580,11 @@ class Parameterizer(utils.TaskBase):
         %(TaskBase.make_run_config.parameters)s
         full_nml: dict
             The dictionary with all the namelists"""
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
+        nml = full_nml.setdefault('weathergen_ctl', {})
+        attrs = sp.plotters[0].plot_data[1].attrs
         for key in ['rsquared', 'slope', 'intercept']:
-            info[key] = float(sp.plotters[0].plot_data[1].attrs[key])
-        nml['g_scale_coeff'] = float(
-            sp.plotters[0].plot_data[1].attrs['slope'])
+            info[key] = float(attrs[key])
+        nml['g_scale_coeff'] = float(attrs['slope'])
         nml.update(self._gp_nml)
         info.update(self._gp_info)
 
@@ -136,16 +652,17 @@ class DailyGHCNData(Parameterizer):
 
     def setup_from_file(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'year', 'month', 'day']
+        # single precision is enough for values in tenth of mm and degC
         kwargs['dtype'] = {
-            'prcp': np.float64,
+            'prcp': np.float32,
             'prcp_m': str,
             'prcp_q': str,
             'prcp_s': str,
-            'tmax': np.float64,
+            'tmax': np.float32,
             'tmax_m': str,
             'tmax_q': str,
             'tmax_s': str,
-            'tmin': np.float64,
+            'tmin': np.float32,
             'tmin_m': str,
             'tmin_q': str,
             'tmin_s': str}
@@ -160,18 +677,80 @@ class DailyGHCNData(Parameterizer):
             self.data[flag] = self.data[flag].str.strip()
 
     def setup_from_scratch(self):
-        from gwgen.parseghcnrow import read_ghcn_file
+        from gwgen.parseghcnrow import read_ghcn_files
         logger = self.logger
         stations = self.stations
         logger.debug('Reading daily ghcn data for %s stations', len(stations))
         src_dir = self.data_dir
         logger.debug('    Data source: %s', src_dir)
         files = list(map(lambda s: osp.join(src_dir, s + '.dly'), stations))
-        self.data = pd.concat(
-            list(map(read_ghcn_file, files)), copy=False).set_index(
-                ['id', 'year', 'month', 'day'])
+        cache_file = None
+        if self.task_config.cache:
+            cache_file = self._cache_file(files)
+        if cache_file is not None and osp.exists(cache_file):
+            logger.debug('    Loading parsed data from %s', cache_file)
+            self.data = pd.read_pickle(cache_file)
+            return
+        # the files are read one after another: this method already runs in
+        # one of the worker processes of the TaskManager and the fortran
+        # parser always opens unit 10, so it cannot be used from threads
+        self.data = read_ghcn_files(files).set_index(
+            ['id', 'year', 'month', 'day'])
+        if cache_file is not None:
+            logger.debug('    Caching parsed data in %s', cache_file)
+            os.makedirs(osp.dirname(cache_file), exist_ok=True)
+            # write to a temporary file first such that no other process reads
+            # an incomplete cache
+            tmp = cache_file + '.%i.tmp' % os.getpid()
+            self.data.to_pickle(tmp)
+            os.replace(tmp, cache_file)
+            self._remove_old_caches(cache_file)
         self.logger.debug('Done.')
 
+    def _cache_file(self, files):
+        """Get the pickle file that caches the parsed data of `files`
+
+        The name of the file is ``<stations>_<mtimes>.pkl`` where
+        ``<stations>`` is a hash of the files and ``<mtimes>`` a hash of their
+        modification times, such that the cache is invalidated when one of the
+        files changes
+
+        Parameters
+        ----------
+        files: list of str
+            The paths to the raw data files
+
+        Returns
+        -------
+        str
+            The path to the pickle file"""
+        import hashlib
+        files = sorted(files)
+        stations_key = hashlib.sha1('\n'.join(files).encode())
+        mtimes_key = hashlib.sha1('\n'.join(
+            repr(os.stat(f).st_mtime) for f in files).encode())
+        return osp.join(self.task_data_dir, 'ghcn_daily_cache', '%s_%s.pkl' % (
+            stations_key.hexdigest(), mtimes_key.hexdigest()))
+
+    @staticmethod
+    def _remove_old_caches(cache_file):
+        """Remove the caches of the same stations that `cache_file` replaces
+
+        Parameters
+        ----------
+        cache_file: str
+            The pickle file as returned by :meth:`_cache_file`"""
+        dirname, fname = osp.split(cache_file)
+        prefix = fname.split('_')[0] + '_'
+        for old in os.listdir(dirname):
+            if (old != fname and old.startswith(prefix) and
+                    old.endswith('.pkl')):
+                # another process might have removed it already
+                try:
+                    os.remove(osp.join(dirname, old))
+                except OSError:
+                    pass
+
     @classmethod
     def _modify_parser(cls, parser):
         parser.setup_args(default_daily_ghcn_config)
@@ -179,6 +758,7 @@ class DailyGHCNData(Parameterizer):
             parser)
         parser.update_arg('download', short='d', group=setup_grp,
                           choices=['single', 'all'])
+        parser.update_arg('cache', group=setup_grp)
         return parser, setup_grp, run_grp
 
     def init_from_scratch(self):
@@ -211,10 +791,7 @@ class DailyGHCNData(Parameterizer):
                                                  '.tar.gz')
                 if not osp.exists(tarfname):
                     if download is None:
-                        if six.PY2:
-                            raise IOError(msg)
-                        else:
-                            raise FileNotFoundError(msg)
+                        raise FileNotFoundError(msg)
                     else:
                         logger.debug('    Downloading rawdata from %s',
                                      self.http_source)
@@ -223,12 +800,16 @@ class DailyGHCNData(Parameterizer):
                         utils.download_file(self.http_source, tarfname)
                         self.project_config['ghcn_download'] = dt.datetime.now()
                     self.project_config['ghcn_src'] = tarfname
-                taro = tarfile.open(tarfname, 'r|gz')
                 logger.debug('    Extracting to %s', osp.dirname(src_dir))
-                taro.extractall(osp.dirname(src_dir))
+                # the archive contains many small files, so we use larger
+                # buffers than the defaults for the stream and the
+                # extracted files
+                with tarfile.open(tarfname, 'r|gz', bufsize=1 << 20) as taro:
+                    taro.copybufsize = 1 << 20
+                    taro.extractall(osp.dirname(src_dir))
 
 
-_DailyGHCNConfig = namedtuple('_DailyGHCNConfig', ['download'])
+_DailyGHCNConfig = namedtuple('_DailyGHCNConfig', ['download', 'cache'])
 
 _DailyGHCNConfig = utils.append_doc(
     _DailyGHCNConfig, docstrings.get_sections("""
@@ -239,6 +820,15 @@ download: { 'single' | 'all' | None }
     raises an Error.
     Otherwise, if ``'single'``, download the missing file from %s. If ``'all'``
     the entire tarball is downloaded from %s
+cache: bool
+    If True, the parsed raw data is stored in a pickle file in the data
+    directory of the task and reused in the next setup from scratch of the
+    same stations, as long as their raw data files did not change. A pickle
+    replaces the one of the same stations with older raw data files. Pickles
+    for other station lists (e.g. because the stations are split up
+    differently with another number of processes) are kept, so delete the
+    ``ghcn_daily_cache`` directory in the data directory of the task to free
+    the disk space
 """ % (DailyGHCNData.http_single, DailyGHCNData.http_source),
         '_DailyGHCNConfig'))
 
@@ -248,7 +838,7 @@ DailyGHCNConfig = utils.enhanced_config(_DailyGHCNConfig, 'DailyGHCNConfig')
 
 @docstrings.dedent
 def default_daily_ghcn_config(
-        download=None, *args, **kwargs):
+        download=None, cache=False, *args, **kwargs):
     """
     The default configuration for :class:`DailyGHCNData` instances.
     See also the :attr:`DailyGHCNData.default_config` attribute
@@ -256,7 +846,8 @@ def default_daily_ghcn_config(
     Parameters
     ----------
     %(DailyGHCNConfig.parameters)s"""
-    return DailyGHCNConfig(download, *utils.default_config(*args, **kwargs))
+    return DailyGHCNConfig(download, cache,
+                           *utils.default_config(*args, **kwargs))
 
 
 class MonthlyGHCNData(Parameterizer):
@@ -290,11 +881,30 @@ class MonthlyGHCNData(Parameterizer):
 
     def setup_from_db(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'year', 'month']
-        return super(MonthlyGHCNData, self).setup_from_db(*args, **kwargs)
+        super(MonthlyGHCNData, self).setup_from_db(*args, **kwargs)
+        _bool_complete_cols(self.data)
 
     @staticmethod
     def monthly_summary(df):
-        n = calendar.monthrange(df.index[0][1], df.index[0][2])[1]
+        """
+        Calculate the summary of one month of daily data
+
+        This function is meant to be applied to the groups of a
+        ``groupby(level=['id', 'year', 'month'])``. For the data of many
+        months, :meth:`_monthly_summaries` is much faster
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data of one station and month with ``'tmin'``,
+            ``'tmax'`` and ``'prcp'`` columns and an index with ``'id'``,
+            ``'year'`` and ``'month'`` as the first levels
+
+        Returns
+        -------
+        pandas.DataFrame
+            The summary of the month in one row"""
+        n = _days_in_month(df.index[0][1], df.index[0][2])
         return pd.DataFrame.from_dict(OrderedDict([
             ('tmin', [df.tmin.mean()]), ('tmax', [df.tmax.mean()]),
             ('trange', [(df.tmax - df.tmin).mean()]),
@@ -305,26 +915,45 @@ class MonthlyGHCNData(Parameterizer):
             ('prcp_complete', [df.prcp.count() == n]),
             ('wet_day', [df.prcp[df.prcp.notnull() & (df.prcp > 0)].size])]))
 
+    @staticmethod
+    def _monthly_summaries(df):
+        """
+        Calculate the :meth:`monthly_summary` for all months at once
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data with ``'tmin'``, ``'tmax'`` and ``'prcp'`` columns
+            and an index with ``'id'``, ``'year'`` and ``'month'`` levels
+
+        Returns
+        -------
+        pandas.DataFrame
+            The summary for each station, year and month"""
+        levels = ['id', 'year', 'month']
+        g = df.groupby(level=levels)
+        counts = g[['tmin', 'tmax', 'prcp']].count()
+        index = counts.index
+        n = _days_in_month(index.get_level_values('year'),
+                           index.get_level_values('month'))
+        return pd.DataFrame.from_dict(OrderedDict([
+            ('tmin', g.tmin.mean()), ('tmax', g.tmax.mean()),
+            ('trange', (df.tmax - df.tmin).groupby(level=levels).mean()),
+            ('prcp', g.prcp.sum()), ('tmin_abs', g.tmin.min()),
+            ('tmax_abs', g.tmax.max()), ('prcpmax', g.prcp.max()),
+            ('tmin_complete', counts.tmin.values == n),
+            ('tmax_complete', counts.tmax.values == n),
+            ('prcp_complete', counts.prcp.values == n),
+            ('wet_day', (df.prcp > 0).groupby(level=levels).sum().astype(
+                int))]))
+
     def setup_from_scratch(self):
-        def year_complete(series):
-            """Check whether the data for the given is complete"""
-            return series.astype(int).sum() == 12
-        data = self.day.data.groupby(level=['id', 'year', 'month']).apply(
-            self.monthly_summary)
-        data.index = data.index.droplevel(-1)
+        data = self._monthly_summaries(self.day.data)
 
         complete_cols = [col for col in data.columns
                          if col.endswith('complete')]
 
-        df_yearly = data[complete_cols].groupby(level=['id', 'year']).agg(
-            year_complete)
-
-        names = data.index.names
-        data = data.reset_index().merge(
-            df_yearly[complete_cols].reset_index(), on=['id', 'year'],
-            suffixes=['', '_year']).set_index(names)
-
-        self.data = data
+        self.data = _add_complete_years(data, complete_cols)
 
 
 class CompleteMonthlyGHCNData(MonthlyGHCNData):
@@ -341,11 +970,13 @@ class CompleteMonthlyGHCNData(MonthlyGHCNData):
 
     summary = "Extract the complete months from the monthly data"
 
+    #: The boolean columns of the monthly data that have to be True for the
+    #: months to select
+    complete_cols = ['prcp_complete', 'tmin_complete', 'tmax_complete']
+
     def setup_from_scratch(self):
         all_months = self.month.data
-        self.data = all_months[all_months.prcp_complete &
-                               all_months.tmin_complete &
-                               all_months.tmax_complete]
+        self.data = all_months[_complete_mask(all_months, self.complete_cols)]
 
 
 class YearlyCompleteMonthlyGHCNData(CompleteMonthlyGHCNData):
@@ -363,11 +994,8 @@ class YearlyCompleteMonthlyGHCNData(CompleteMonthlyGHCNData):
     summary = (
         "Extract the complete months from the monthly data in complete years")
 
-    def setup_from_scratch(self):
-        all_months = self.month.data
-        self.data = all_months[all_months.prcp_complete_year &
-                               all_months.tmin_complete_year &
-                               all_months.tmax_complete_year]
+    complete_cols = ['prcp_complete_year', 'tmin_complete_year',
+                     'tmax_complete_year']
 
 
 class CompleteDailyGHCNData(DailyGHCNData):
@@ -394,14 +1022,15 @@ class CompleteDailyGHCNData(DailyGHCNData):
     def init_from_scratch(self):
         pass
 
+    #: The boolean columns of the monthly data that have to be True for the
+    #: months to select
+    complete_cols = CompleteMonthlyGHCNData.complete_cols
+
     def setup_from_scratch(self):
+        days = self.day.data
         monthly = self.month.data
-        self.data = self.day.data.reset_index().merge(
-            monthly[monthly.prcp_complete &
-                    monthly.tmin_complete &
-                    monthly.tmax_complete][[]].reset_index(),
-            how='inner', on=['id', 'year', 'month'], copy=False).set_index(
-                ['id', 'year', 'month', 'day'])
+        months = monthly.index[_complete_mask(monthly, self.complete_cols)]
+        self.data = days[days.index.droplevel('day').isin(months)]
 
 
 class YearlyCompleteDailyGHCNData(CompleteDailyGHCNData):
@@ -417,14 +1046,7 @@ class YearlyCompleteDailyGHCNData(CompleteDailyGHCNData):
 
     summary = "Get the days of the complete months in complete years"
 
-    def setup_from_scratch(self):
-        monthly = self.month.data
-        self.data = self.day.data.reset_index().merge(
-            monthly[monthly.prcp_complete_year &
-                    monthly.tmin_complete_year &
-                    monthly.tmax_complete_year][[]].reset_index(),
-            how='inner', on=['id', 'year', 'month'], copy=False).set_index(
-                ['id', 'year', 'month', 'day'])
+    complete_cols = YearlyCompleteMonthlyGHCNData.complete_cols
 
 _PrcpConfig = namedtuple('_PrcpConfig', ['thresh', 'threshs2compute'])
 
@@ -533,27 +1155,79 @@ class PrcpDistParams(Parameterizer):
         kwargs['index_col'] = ['id', 'month', 'thresh']
         return super(PrcpDistParams, self).setup_from_db(*args, **kwargs)
 
+    #: The cached result of :attr:`filtered_data` together with the data and
+    #: the threshold it has been computed for
+    _filtered_data = None
+
     @property
     def filtered_data(self):
         """Return the data that only belongs to the specified threshold of the
         task"""
-        sl = (slice(None), slice(None), self.task_config.thresh)
-        return self.data.sort_index().loc[sl, :]
+        data = self.data
+        thresh = self.task_config.thresh
+        cached = self._filtered_data
+        if cached is None or cached[0] is not data or cached[1] != thresh:
+            if not data.index.is_monotonic_increasing:
+                data = data.sort_index()
+            sl = (slice(None), slice(None), thresh)
+            self._filtered_data = cached = (self.data, thresh,
+                                            data.loc[sl, :])
+        return cached[2]
+
+    def _log_fit_error(self, df):
+        """Log the current exception of a failed fit and save the data
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The data of the station and month that could not be fitted"""
+        index = df.index
+        self.logger.critical(
+            'Error while calculating GP parameters for %s!',
+            ', '.join(str(index.get_level_values(n).unique())
+                      for n in index.names),
+            exc_info=True)
+        tmp = tempfile.NamedTemporaryFile(suffix='.csv').name
+        df.to_csv(tmp)
+        self.logger.critical('Data stored in %s', tmp)
+
+    #: The columns of the :attr:`data` computed by :meth:`prcp_dist_params`
+    param_cols = ['n', 'ngamma', 'mean_wet', 'ngp', 'gshape', 'gscale',
+                  'pshape', 'pscale', 'pscale_orig']
 
     def prcp_dist_params(
             self, df, threshs=np.array([5, 7.5, 10, 12.5, 15, 17.5, 20])):
+        """
+        Fit the hybrid Gamma-GP distribution to the precipitation of one group
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data of one station and month with a ``'prcp'`` column
+        threshs: np.ndarray
+            The thresholds for the GP distribution
+
+        Returns
+        -------
+        np.ndarray
+            The parameters with one row for each threshold in `threshs` and
+            one column for each of the :attr:`param_cols`"""
         from scipy import stats
-        vals = df.prcp.values[~np.isnan(df.prcp.values)]
+        prcp = df.prcp.values
         N = len(threshs)
-        n = len(vals) * N
-        vals = vals[vals > 0]
+        n = (len(prcp) - np.count_nonzero(np.isnan(prcp))) * N
+        # select the wet days (NaN is never > 0) in double precision for the
+        # fits and sort them such that the values above each threshold are a
+        # simple slice
+        vals = prcp[prcp > 0].astype(np.float64)
+        vals.sort()
         ngamma = len(vals)
-        ngp = [np.nan] * N
+        ngp = np.full(N, np.nan)
         gshape = np.nan
         gscale = np.nan
-        pshape = [np.nan] * N
-        pscale = [np.nan] * N
-        pscale_orig = [np.nan] * N
+        pshape = np.full(N, np.nan)
+        pscale = pshape.copy()
+        pscale_orig = pshape.copy()
         if ngamma > 10:
             # fit the gamma curve. We fix the (unnecessary) location parameter
             # to improve the result (see
@@ -561,33 +1235,22 @@ class PrcpDistParams(Parameterizer):
             try:
                 gshape, _, gscale = stats.gamma.fit(vals, floc=0)
             except:
-                self.logger.critical(
-                    'Error while calculating GP parameters for %s!',
-                    ', '.join(str(df.index.get_level_values(n).unique())
-                              for n in df.index.names),
-                    exc_info=True)
-                tmp = tempfile.NamedTemporaryFile(suffix='.csv').name
-                df.to_csv(tmp)
-                self.logger.critical('Data stored in %s', tmp)
+                self._log_fit_error(df)
             else:
                 for i, thresh in enumerate(threshs):
-                    arr = vals[vals >= thresh]
+                    arr = vals[np.searchsorted(vals, thresh):]
                     ngp[i] = len(arr)
                     if ngp[i] > 10:
+                        # start the optimization at the closed form
+                        # estimate if possible
+                        guess = _genpareto_pwm(arr, thresh)
+                        args, kws = ((), {}) if guess is None else (
+                            guess[:1], {'scale': guess[1]})
                         try:
                             pshape[i], _, pscale_orig[i] = stats.genpareto.fit(
-                                arr, floc=thresh)
+                                arr, *args, floc=thresh, **kws)
                         except:
-                            self.logger.critical(
-                                'Error while calculating GP parameters for '
-                                '%s!', ', '.join(
-                                    str(df.index.get_level_values(n).unique())
-                                    for n in df.index.names),
-                                exc_info=True)
-                            tmp = tempfile.NamedTemporaryFile(
-                                suffix='.csv').name
-                            df.to_csv(tmp)
-                            self.logger.critical('Data stored in %s', tmp)
+                            self._log_fit_error(df)
                         else:
                             # find the crossover point where the gamma and
                             # pareto distributions should match this follows
@@ -597,14 +1260,10 @@ class PrcpDistParams(Parameterizer):
                             pscale[i] = (1 - stats.gamma.cdf(
                                 thresh, gshape, scale=gscale))/stats.gamma.pdf(
                                     thresh, gshape, scale=gscale)
-        return pd.DataFrame.from_dict(OrderedDict([
-            ('n', np.repeat(n, N)), ('ngamma', np.repeat(ngamma, N)),
-            ('mean_wet', np.repeat(vals.mean(), N)),
-            ('ngp', ngp), ('thresh', threshs),
-            ('gshape', np.repeat(gshape, N)),
-            ('gscale', np.repeat(gscale, N)), ('pshape', pshape),
-            ('pscale', pscale),
-            ('pscale_orig', pscale_orig)])).set_index('thresh')
+        # one row per threshold in the order of the :attr:`param_cols`
+        return np.column_stack(np.broadcast_arrays(
+            n, ngamma, vals.mean(), ngp, gshape, gscale, pshape, pscale,
+            pscale_orig))
 
     def setup_from_scratch(self):
         self.logger.debug('Calculating precipitation parameters.')
@@ -612,8 +1271,22 @@ class PrcpDistParams(Parameterizer):
         threshs = np.array(self.task_config.threshs2compute)
         if self.task_config.thresh not in threshs:
             threshs = np.append(threshs, self.task_config.thresh)
-        func = partial(self.prcp_dist_params, threshs=threshs)
-        self.data = df.groupby(level=['id', 'month']).apply(func)
+        g = df.groupby(level=['id', 'month'])
+        # the stations are already distributed over the worker processes of
+        # the TaskManager (see :attr:`setup_parallel`), so we do not spawn
+        # another pool here (the workers are daemonic and cannot have
+        # children)
+        cols = self.param_cols
+        arrays = [self.prcp_dist_params(group, threshs) for _, group in g]
+        keys = g.size().index
+        N = len(threshs)
+        index = pd.MultiIndex.from_arrays(
+            [keys.get_level_values('id').repeat(N),
+             keys.get_level_values('month').repeat(N),
+             np.tile(threshs, len(keys))], names=['id', 'month', 'thresh'])
+        self.data = pd.DataFrame(
+            np.concatenate(arrays) if arrays else np.empty((0, len(cols))),
+            index=index, columns=cols).astype({'n': int, 'ngamma': int})
         self.logger.debug('Done.')
 
     @property
@@ -647,11 +1320,11 @@ class PrcpDistParams(Parameterizer):
         Parameters
         ----------
         %(Parameterizer.make_run_config.parameters)s"""
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
+        nml = full_nml.setdefault('weathergen_ctl', {})
+        attrs = sp.plotters[0].plot_data[1].attrs
         for key in ['rsquared', 'slope', 'intercept']:
-            info[key] = float(sp.plotters[0].plot_data[1].attrs[key])
-        nml['g_scale_coeff'] = float(
-            sp.plotters[0].plot_data[1].attrs['slope'])
+            info[key] = float(attrs[key])
+        nml['g_scale_coeff'] = float(attrs['slope'])
         nml['thresh'] = self.task_config.thresh
         nml.update(self._gp_nml)
         info.update(self._gp_info)
@@ -747,6 +1420,11 @@ class MarkovChain(Parameterizer):
             ret[flag] = sqlalchemy.REAL
         return ret
 
+    #: The transition counts computed by :meth:`calc_ndays` and
+    #: :meth:`calc_transitions`
+    count_cols = ['n', 'nwet', 'ndry', 'np11', 'np01', 'np001', 'np001_denom',
+                  'np101', 'np101_denom']
+
     def setup_from_file(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'month']
         return super(MarkovChain, self).setup_from_file(*args, **kwargs)
@@ -758,42 +1436,49 @@ class MarkovChain(Parameterizer):
     @classmethod
     def calc_ndays(cls, df):
         if not len(df):
-            return pd.DataFrame([[np.nan] * 9], columns=[
-                'n', 'nwet', 'ndry', 'np11', 'np01',  'np001', 'np001_denom',
-                'np101', 'np101_denom'], dtype=int)
-        vals = df.prcp.values
+            return pd.DataFrame([[np.nan] * 9], columns=cls.count_cols,
+                                dtype=int)
+        return pd.DataFrame([cls._count_ndays(df.prcp.values)],
+                            columns=cls.count_cols)
+
+    @staticmethod
+    def _count_ndays(vals):
+        """Compute the counts of :meth:`calc_ndays` for an array of
+        precipitation"""
+        if njit is not None:
+            return _count_transitions(_kernel_array(vals))
         n = len(vals)
-        nwet = (vals[:-1] > 0.0).sum()   #: number of wet days
-        ndry = (vals[:-1] == 0.0).sum()  #: number of dry days
+        # compute the wet and dry masks only once. Note that missing values
+        # are neither wet nor dry
+        wet = vals > 0.0
+        dry = vals == 0.0
+        count = np.count_nonzero
+        nwet = count(wet[:-1])  #: number of wet days
+        ndry = count(dry[:-1])  #: number of dry days
         # ---------------------------------------------------
         # PWW = Prob(Wet then Wet) = P11
         #     = wetwet / wetwet + wetdry
         #     = wetwet / nwet
-        np11 = ((vals[:-1] > 0.0) & (vals[1:] > 0.0)).sum()
+        np11 = count(wet[:-1] & wet[1:])
         # ---------------------------------------------------
         # PWD = Prob(Dry then Wet) = P01
         #     = drywet / drywet + drydry
         #     = wetwet / ndry
-        np01 = ((vals[:-1] == 0.0) & (vals[1:] > 0.0)).sum()
+        np01 = count(dry[:-1] & wet[1:])
         # ---------------------------------------------------
         # PWDD = Prob(Dry Dry Wet) = P001
         #      = drydryWET / (drydryWET + drydryDRY)
-        np001 = ((vals[:-2] == 0.0) & (vals[1:-1] == 0.0) &
-                 (vals[2:] > 0.0)).sum()
-        np001_denom = np001 + ((vals[:-2] == 0.0) & (vals[1:-1] == 0.0) &
-                               (vals[2:] == 0.0)).sum()
+        drydry = dry[:-2] & dry[1:-1]
+        np001 = count(drydry & wet[2:])
+        np001_denom = np001 + count(drydry & dry[2:])
         # ---------------------------------------------------
         # PWDW = Prob(Wet Dry Wet) = P101
         #      = wetdryWET / (wetdryWET + wetdryDRY)
-        np101 = ((vals[:-2] > 0.0) & (vals[1:-1] == 0.0) &
-                 (vals[2:] > 0.0)).sum()
-        np101_denom = np101 + ((vals[:-2] > 0.0) & (vals[1:-1] == 0.0) &
-                               (vals[2:] == 0.0)).sum()
-        return pd.DataFrame(
-            [[n, nwet, ndry, np11, np01, np001, np001_denom, np101,
-              np101_denom]],
-            columns=['n', 'nwet', 'ndry', 'np11', 'np01', 'np001',
-                     'np001_denom', 'np101', 'np101_denom'])
+        wetdry = wet[:-2] & dry[1:-1]
+        np101 = count(wetdry & wet[2:])
+        np101_denom = np101 + count(wetdry & dry[2:])
+        return (n, nwet, ndry, np11, np01, np001, np001_denom, np101,
+                np101_denom)
 
     @classmethod
     def calculate_probabilities(cls, df):
@@ -801,28 +1486,107 @@ class MarkovChain(Parameterizer):
         years"""
         # we group here for each month because we do not want to treat each
         # month separately
-        g = df.groupby(level=['year', 'month'])
+        g = df.prcp.groupby(level=['year', 'month'])
         if g.ngroups > 10:
-            dfs = g.apply(cls.calc_ndays).sum()
-            return pd.DataFrame.from_dict(OrderedDict([
-                ('p11', [dfs.np11 / dfs.nwet if dfs.nwet > 0 else 0]),
-                ('p01', [dfs.np01 / dfs.ndry if dfs.ndry > 0 else 0]),
-                ('p001', [dfs.np001 / dfs.np001_denom
-                          if dfs.np001_denom > 0 else 0]),
-                ('p101', [dfs.np101 / dfs.np101_denom
-                          if dfs.np101_denom > 0 else 0]),
-                ('wetf', [dfs.nwet / dfs.n if dfs.n > 0 else 0])]))
+            counts = np.zeros((g.ngroups, len(cls.count_cols)), dtype=int)
+            for i, (key, s) in enumerate(g):
+                counts[i] = cls._count_ndays(s.values)
+            return cls.calc_ratios(pd.DataFrame(
+                counts.sum(axis=0)[np.newaxis], columns=cls.count_cols))
         else:
             return pd.DataFrame.from_dict(
                 {'p11': [], 'p01': [], 'p001': [], 'p101': [], 'wetf': []})
 
+    @staticmethod
+    def calc_ratios(counts):
+        """
+        Calculate the transition probabilities from the transition counts
+
+        Parameters
+        ----------
+        counts: pandas.DataFrame
+            The counts as computed by :meth:`calc_ndays` or
+            :meth:`calc_transitions`
+
+        Returns
+        -------
+        pandas.DataFrame
+            The ``'p11'``, ``'p01'``, ``'p001'``, ``'p101'`` and ``'wetf'``
+            probabilities for each row in `counts` (0 where the denominator
+            is 0)"""
+        def ratio(num, denom):
+            num = counts[num].values.astype(np.float64)
+            denom = counts[denom].values.astype(np.float64)
+            return np.divide(num, denom, out=np.zeros_like(num),
+                             where=denom > 0)
+
+        return pd.DataFrame.from_dict(OrderedDict([
+            ('p11', ratio('np11', 'nwet')),
+            ('p01', ratio('np01', 'ndry')),
+            ('p001', ratio('np001', 'np001_denom')),
+            ('p101', ratio('np101', 'np101_denom')),
+            ('wetf', ratio('nwet', 'n'))]))
+
+    @staticmethod
+    def calc_transitions(df):
+        """
+        Calculate the transition counts for each month of each station
+
+        This method is a vectorized version of :meth:`calc_ndays` that
+        processes all months in `df` at once
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data with a ``'prcp'`` column and an index with
+            ``'id'``, ``'year'`` and ``'month'`` levels that is sorted by time
+
+        Returns
+        -------
+        pandas.DataFrame
+            The counts of :meth:`calc_ndays` for each station, year and month
+        """
+        def shift(arr, i):
+            ret = np.zeros_like(arr)
+            ret[:-i] = arr[i:]
+            return ret
+
+        vals = df.prcp.values
+        n = len(vals)
+        # True where the next day (the day after the next day) belongs to the
+        # same month
+        next1 = np.zeros(n, dtype=bool)
+        next1[:-1] = np.logical_and.reduce([
+            key[1:] == key[:-1] for key in map(
+                df.index.get_level_values, ['id', 'year', 'month'])])
+        next2 = next1 & shift(next1, 1)
+        wet = vals > 0.0
+        dry = vals == 0.0
+        wet1 = shift(wet, 1)
+        wet2 = shift(wet, 2)
+        valid2 = wet2 | shift(dry, 2)
+        nwet = wet & next1
+        ndry = dry & next1
+        drydry = dry & shift(dry, 1) & next2
+        wetdry = wet & shift(dry, 1) & next2
+        counts = pd.DataFrame(
+            np.column_stack([
+                np.ones(n, dtype=bool), nwet, ndry, nwet & wet1, ndry & wet1,
+                drydry & wet2, drydry & valid2, wetdry & wet2,
+                wetdry & valid2]).astype(int),
+            index=df.index, columns=MarkovChain.count_cols)
+        return counts.groupby(level=['id', 'year', 'month']).sum()
+
     def setup_from_scratch(self):
         self.logger.debug('Calculating markov chain parameters')
         df = self.cday.data
-        data = df.groupby(level=['id', 'month']).apply(
-            self.calculate_probabilities)
-        data.index = data.index.droplevel(-1)
-        self.data = data
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        g = self.calc_transitions(df).groupby(level=['id', 'month'])
+        # use only the months with more than 10 years of data
+        counts = g.sum()[g.size() > 10]
+        self.data = self.calc_ratios(counts)
+        self.data.index = counts.index
         self.logger.debug('Done.')
 
     @property
@@ -871,16 +1635,15 @@ class MarkovChain(Parameterizer):
         Parameters
         ----------
         %(Parameterizer.make_run_config.parameters)s"""
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
-        for plotter in sp.plotters:
-            d = info[plotter.data.name] = OrderedDict()
-            for key in ['rsquared', 'slope', 'intercept']:
-                d[key] = float(plotter.plot_data[1].attrs[key])
+        nml = full_nml.setdefault('weathergen_ctl', {})
         for plotter in sp.plotters:
             name = plotter.data.name
-            nml[name + '_1'] = float(plotter.plot_data[1].attrs.get(
-                'intercept', 0))
-            nml[name + '_2'] = float(plotter.plot_data[1].attrs.get('slope'))
+            attrs = plotter.plot_data[1].attrs
+            d = info[name] = {}
+            for key in ['rsquared', 'slope', 'intercept']:
+                d[key] = float(attrs[key])
+            nml[name + '_1'] = float(attrs.get('intercept', 0))
+            nml[name + '_2'] = float(attrs.get('slope'))
 
 
 class TemperatureParameterizer(Parameterizer):
@@ -965,7 +1728,7 @@ class TemperatureParameterizer(Parameterizer):
         """
         Calculate the statistics for one single month in one year
         """
-        prcp_vals = df.prcp.values
+        prcp_vals = df.prcp.values.astype(np.float64)
         wet = prcp_vals > 0.0
         dry = prcp_vals == 0
         arr_tmin = df.tmin.values
@@ -974,6 +1737,10 @@ class TemperatureParameterizer(Parameterizer):
         arr_tmin_dry = arr_tmin[dry]
         arr_tmax_wet = arr_tmax[wet]
         arr_tmax_dry = arr_tmax[dry]
+        arr_trange_wet = arr_tmax_wet - arr_tmin_wet
+        arr_trange_dry = arr_tmax_dry - arr_tmin_dry
+        arr_trange = arr_tmin - arr_tmax
+        arr_t = (arr_tmin + arr_tmax) * 0.5
         # prcp values
         d = {
             # wet values
@@ -981,40 +1748,120 @@ class TemperatureParameterizer(Parameterizer):
             'tmax_wet': arr_tmax_wet.mean(),
             'tminstddev_wet': arr_tmin_wet.std(),
             'tmaxstddev_wet': arr_tmax_wet.std(),
-            'trange_wet': (arr_tmax_wet - arr_tmax_wet).mean(),
-            'trangestddev_wet': (arr_tmax_wet - arr_tmin_wet).std(),
+            'trange_wet': arr_trange_wet.mean(),
+            'trangestddev_wet': arr_trange_wet.std(),
             # dry values
             'tmin_dry': arr_tmin_dry.mean(),
             'tmax_dry': arr_tmax_dry.mean(),
             'tminstddev_dry': arr_tmin_dry.std(),
             'tmaxstddev_dry': arr_tmax_dry.std(),
-            'trange_dry': (arr_tmax_dry - arr_tmin_dry).mean(),
-            'trangestddev_dry': (arr_tmax_dry - arr_tmin_dry).std(),
+            'trange_dry': arr_trange_dry.mean(),
+            'trangestddev_dry': arr_trange_dry.std(),
             # general mean
             'tmin': arr_tmin.mean(),
             'tmax': arr_tmax.mean(),
             'tminstddev': arr_tmin.std(),
             'tmaxstddev': arr_tmax.std(),
-            'trange': (arr_tmin - arr_tmax).mean(),
-            'trangestddev': (arr_tmin - arr_tmax).std(),
-            't': ((arr_tmin + arr_tmax) * 0.5).mean(),
-            'tstddev': ((arr_tmin + arr_tmax) * 0.5).std()}
+            'trange': arr_trange.mean(),
+            'trangestddev': arr_trange.std(),
+            't': arr_t.mean(),
+            'tstddev': arr_t.std()}
         d['prcp_wet'] = am = prcp_vals[wet].mean()  # arithmetic mean
         gm = np.exp(np.log(prcp_vals[wet]).mean())  # geometric mean
-        fields = am != gm
-        d['alpha'] = (
-            0.5000876 / np.log(am[fields] / gm[fields]) + 0.16488552 -
-            0.0544274 * np.log(am[fields] / gm[fields]))
-        d['beta'] = am / d['alpha']
-        return pd.DataFrame.from_dict(d)
+        if am != gm:
+            t = np.log(am / gm)
+            d['alpha'] = 0.5000876 / t + 0.16488552 - 0.0544274 * t
+            d['beta'] = am / d['alpha']
+        else:
+            d = dict.fromkeys(d, np.nan)
+            d['alpha'] = d['beta'] = np.nan
+        return pd.DataFrame(d, index=[0])
 
     @classmethod
     def calculate_probabilities(cls, df):
         """Calculate the statistics for one month across multiple years"""
         # we group here for each month because we do not want to treat each
         # month separately
-        g = df.groupby(level=['year'])
-        return g.apply(cls.calc_monthly_props).mean()
+        years = df.index.get_level_values('year').values
+        order = np.argsort(years, kind='mergesort')
+        years = years[order]
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1], True])
+
+        def get(col):
+            return _kernel_array(df[col].values[order])
+
+        # compute the statistics of the single years into one array
+        props = _monthly_temperature_props(
+            get('prcp'), get('tmin'), get('tmax'), starts)
+        return pd.DataFrame(props, columns=_temperature_props).mean()
+
+    @staticmethod
+    def calc_all_monthly_props(df):
+        """
+        Calculate the statistics for each month of each station
+
+        This method is a vectorized version of :meth:`calc_monthly_props` that
+        processes all months in `df` at once with grouped aggregations
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data with ``'prcp'``, ``'tmin'`` and ``'tmax'`` columns
+            and an index with ``'id'``, ``'year'`` and ``'month'`` levels
+
+        Returns
+        -------
+        pandas.DataFrame
+            The statistics for each station, year and month. Months where the
+            arithmetic and geometric mean of the precipitation are equal
+            are NaN"""
+        prcp = df.prcp.astype(np.float64)
+        tmin = df.tmin.astype(np.float64)
+        tmax = df.tmax.astype(np.float64)
+        wet = prcp > 0.0
+        dry = prcp == 0.0
+        tmin_missing = tmin.isnull()
+        tmax_missing = tmax.isnull()
+        # the masked values, the statistics of the NaNs are ignored
+        values = OrderedDict()
+        # the missing temperatures that are not masked. As in
+        # calc_monthly_props, they make the statistics NaN
+        missing = OrderedDict()
+        for suffix, mask in [('_wet', wet), ('_dry', dry)]:
+            values['tmin' + suffix] = tn = tmin.where(mask)
+            values['tmax' + suffix] = tx = tmax.where(mask)
+            values['trange' + suffix] = tx - tn
+            missing['tmin' + suffix] = tmin_missing & mask
+            missing['tmax' + suffix] = tmax_missing & mask
+            missing['trange' + suffix] = (tmin_missing | tmax_missing) & mask
+        values['tmin'] = tmin
+        values['tmax'] = tmax
+        values['trange'] = tmin - tmax
+        values['t'] = (tmin + tmax) * 0.5
+        missing['tmin'] = tmin_missing
+        missing['tmax'] = tmax_missing
+        missing['trange'] = missing['t'] = tmin_missing | tmax_missing
+        values['prcp_wet'] = prcp.where(wet)
+        values['log_prcp_wet'] = np.log(prcp.where(wet))
+        levels = ['id', 'year', 'month']
+        g = pd.DataFrame(values).groupby(level=levels)
+        means = g.mean()
+        stds = g.std(ddof=0)
+        invalid = pd.DataFrame(missing).groupby(level=levels).any()
+        for col in invalid.columns:
+            means[col] = means[col].where(~invalid[col].values)
+            stds[col] = stds[col].where(~invalid[col].values)
+        ret = pd.DataFrame(OrderedDict(
+            (col, means[col.replace('stddev', '')] if 'stddev' not in col
+             else stds[col.replace('stddev', '')])
+            for col in _temperature_props[:-3]))
+        ret['prcp_wet'] = am = means['prcp_wet']  # arithmetic mean
+        gm = np.exp(means['log_prcp_wet'])  # geometric mean
+        t = np.log(am / gm)
+        ret['alpha'] = 0.5000876 / t + 0.16488552 - 0.0544274 * t
+        ret['beta'] = am / ret['alpha']
+        ret[(am == gm).values] = np.nan
+        return ret
 
     def setup_from_file(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'month']
@@ -1027,8 +1874,23 @@ class TemperatureParameterizer(Parameterizer):
             *args, **kwargs)
 
     def setup_from_scratch(self):
-        self.data = self.cday.data.groupby(level=['id', 'month']).apply(
-            self.calculate_probabilities)
+        df = self.cday.data
+        if njit is None:
+            monthly = self.calc_all_monthly_props(df)
+        else:
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
+            # the positions where a new month starts (and the end of the data)
+            index = df.index
+            starts = _group_starts(index, ['id', 'year', 'month'])
+            arrays = [_kernel_array(df[col].values)
+                      for col in ['prcp', 'tmin', 'tmax']]
+            monthly = pd.DataFrame(
+                _monthly_temperature_props(*arrays, starts=starts),
+                columns=_temperature_props,
+                index=index[starts[:-1]].droplevel('day'))
+        # the mean over all years skips the NaN months
+        self.data = monthly.groupby(level=['id', 'month']).mean()
 
     def create_project(self, ds):
         """
@@ -1077,18 +1939,17 @@ class TemperatureParameterizer(Parameterizer):
         variables = ['tmin', 'tmax']
         states = ['wet', 'dry']
         types = ['', 'stddev']
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
+        nml = full_nml.setdefault('weathergen_ctl', {})
+        plotters = _plotters_by_name(sp)
         for v, t, state in product(variables, types, states):
             vname = '%s%s_%s' % (v, t, state)
             nml_name = v + ('_sd' if t else '') + '_' + state[0]
             vinfo = info.setdefault(vname, {})
-            plotter = sp(name=vname).plotters[0]
+            attrs = plotters[vname].plot_data[1].attrs
             for key in ['rsquared', 'slope', 'intercept']:
-                vinfo[key] = float(plotter.plot_data[1].attrs[key])
-            nml[nml_name + '1'] = float(
-                plotter.plot_data[1].attrs.get('intercept', 0))
-            nml[nml_name + '2'] = float(
-                plotter.plot_data[1].attrs.get('slope'))
+                vinfo[key] = float(attrs[key])
+            nml[nml_name + '1'] = float(attrs.get('intercept', 0))
+            nml[nml_name + '2'] = float(attrs.get('slope'))
 
 
 _CloudConfig = namedtuple('_CloudConfig', ['args_type'])
@@ -1168,15 +2029,12 @@ class CloudParameterizerBase(Parameterizer):
                                                               dtype=int)
         elif at == 'ghcn':
             Norig = len(stations)
-            df_map = self.eecra_ghcn_map()
-            try:
-                df_map = df_map.loc[stations].dropna()
-            except KeyError:
-                self._stations = df_map.index.values[:0]
-                self.eecra_stations = df_map.station_id.values[:0].astype(int)
-            else:
-                self._stations = df_map.index.values
-                self.eecra_stations = df_map.station_id.values.astype(int)
+            id_map = _read_eecra_ghcn_dict(
+                _eecra_ghcn_map_file(self.data_dir))
+            stations = [s for s in stations if s in id_map]
+            self._stations = np.array(stations, dtype=object)
+            self.eecra_stations = np.fromiter(
+                map(id_map.get, stations), dtype=int, count=len(stations))
             self.logger.debug(
                 'Using %i cloud stations in the %i given stations',
                 len(self._stations), Norig)
@@ -1187,20 +2045,10 @@ class CloudParameterizerBase(Parameterizer):
 
     def eecra_ghcn_map(self):
         """Get a dataframe mapping from GHCN id to EECRA station_id"""
-        cls = CloudParameterizerBase
         if self.args_type == 'eecra':
             return pd.DataFrame(self.eecra_stations, columns=['station_id'],
                                 index=pd.Index(self.eecra_stations, name='id'))
-        try:
-            return cls._eecra_ghcn_map
-        except AttributeError:
-            fname = osp.join(self.data_dir, 'eecra_ghcn_map.csv')
-            if not osp.exists(fname):
-                fname = osp.join(
-                    utils.get_module_path(inspect.getmodule(cls)), 'data',
-                    'eecra_ghcn_map.csv')
-            cls._eecra_ghcn_map = pd.read_csv(fname, index_col='id')
-        return cls._eecra_ghcn_map
+        return _read_eecra_ghcn_map(_eecra_ghcn_map_file(self.data_dir))
 
     @classmethod
     def filter_stations(cls, stations):
@@ -1215,7 +2063,8 @@ class CloudParameterizerBase(Parameterizer):
         -------
         np.ndarray
             The ids in `stations` that can be mapped to the eecra dataset"""
-        return cls.eecra_ghcn_map().loc[stations].dropna().index.values
+        id_map = _read_eecra_ghcn_dict(_eecra_ghcn_map_file())
+        return np.array([s for s in stations if s in id_map], dtype=object)
 
     @classmethod
     def _modify_parser(cls, parser):
@@ -1288,8 +2137,6 @@ class HourlyCloud(CloudParameterizerBase):
         range(1, 13),
         "JAN FEB MAR APR MAY JUN JUL AUG SEP OCT NOV DEC".split()))
 
-    _continue = False
-
     @property
     def sql_dtypes(self):
         import sqlalchemy
@@ -1323,6 +2170,15 @@ class HourlyCloud(CloudParameterizerBase):
                     "IP": sqlalchemy.SMALLINT})
         return ret
 
+    #: The data types of the columns in the station files, corresponding to
+    #: the :attr:`sql_dtypes`
+    dtypes = dict(chain(
+        [('lat', np.float32), ('lon', np.float32), ('station_id', np.int32)],
+        zip(['IB', 'LO', 'ww', 'N', 'Nh', 'h', 'CL', 'CM', 'CH', 'UM', 'UH',
+             'IC', 'WD', 'EL', 'IW', 'IP'], repeat(np.int16)),
+        zip(['AM', 'AH', 'SA', 'RI', 'SLP', 'WS', 'AT', 'DD'],
+            repeat(np.float32))))
+
     years = range(1971, 2010)
 
     months = range(1, 13)
@@ -1350,6 +2206,7 @@ class HourlyCloud(CloudParameterizerBase):
             osp.join(src_dir, str(s) + '.csv') for s in self.eecra_stations]
 
     @classmethod
+    @lru_cache(maxsize=None)
     @docstrings.get_sectionsf('HourlyCloud.eecra_fname')
     @docstrings.dedent
     def eecra_fname(cls, year, mon, ext=''):
@@ -1366,6 +2223,7 @@ class HourlyCloud(CloudParameterizerBase):
         return c_mon + c_yr[-2:] + 'L' + ext
 
     @classmethod
+    @lru_cache(maxsize=None)
     @docstrings.dedent
     def get_eecra_url(cls, year, mon):
         """
@@ -1379,13 +2237,37 @@ class HourlyCloud(CloudParameterizerBase):
             if (year, mon) >= d0 and (year, mon) <= d1:
                 return url + cls.eecra_fname(year, mon, '.Z')
 
-    def _download_worker(self, qin, qout):
-        while self._continue:
-            yrmon, fname = qin.get()
-            utils.download_file(self.get_eecra_url(*yrmon), fname)
-            spr.call(['gzip', '-d', fname])
-            qout.put((yrmon, osp.splitext(fname)[0]))
-            qin.task_done()
+    def _download_file(self, yrmon, fname, force=False, keep=False):
+        """Download and decompress the source file of one month"""
+        compressed_fname = fname + '.Z'
+        download = force or not osp.exists(compressed_fname)
+        # the files are LZW compressed which is not supported by the gzip
+        # module, so we still have to call the gzip executable
+        if not download or keep:
+            if download:
+                utils.download_file(self.get_eecra_url(*yrmon),
+                                    compressed_fname)
+            spr.call(['gzip', '-d', compressed_fname] + (['-k'] * keep))
+            return fname
+        # if we do not keep the compressed file, we decompress the data while
+        # downloading it and do not store the compressed file on the disk
+        import shutil
+        from urllib import request
+        url = self.get_eecra_url(*yrmon)
+        self.logger.info('Downloading %s to %s', url, fname)
+        tmp_fname = fname + '.part'
+        with request.urlopen(url) as response, open(tmp_fname, 'wb') as f:
+            proc = spr.Popen(['gzip', '-dc'], stdin=spr.PIPE, stdout=f)
+            try:
+                shutil.copyfileobj(response, proc.stdin, 1 << 20)
+            finally:
+                proc.stdin.close()
+                retcode = proc.wait()
+        if retcode:
+            os.remove(tmp_fname)
+            raise spr.CalledProcessError(retcode, ['gzip', '-dc'])
+        os.replace(tmp_fname, fname)
+        return fname
 
     def init_from_scratch(self):
         """Reimplemented to download the data if not existent"""
@@ -1417,12 +2299,13 @@ class HourlyCloud(CloudParameterizerBase):
 
     def get_data_from_files(self, files):
         def save_loc(fname):
-            try:
-                return pd.read_csv(fname, index_col='station_id').loc[
-                    station_ids]
-            except KeyError:
-                return pd.DataFrame()
+            # filter every chunk to keep only the requested stations in memory
+            return pd.concat([
+                df[df.index.isin(station_ids)] for df in pd.read_csv(
+                    fname, index_col='station_id', dtype=self.dtypes,
+                    chunksize=chunksize)], copy=False)
         station_ids = self.eecra_stations
+        chunksize = self.global_config.get('chunksize', 10 ** 5)
         self.logger.debug('Extracting data for %i stations from %i files',
                           len(station_ids), len(files))
         return pd.concat(
@@ -1433,18 +2316,25 @@ class HourlyCloud(CloudParameterizerBase):
         logger = self.logger
         logger.debug('    Expected data source: %s', src_dir)
         files = self.raw_src_files
-        missing = {yrmon: fname for yrmon, fname in six.iteritems(files)
+        missing = {yrmon: fname for yrmon, fname in files.items()
                    if not osp.exists(fname)}
         logger.debug('%i raw source files are missing.', len(missing))
-        for yrmon, fname in six.iteritems(missing):
-            compressed_fname = fname + '.Z'
-            if force or not osp.exists(compressed_fname):
-                utils.download_file(self.get_eecra_url(*yrmon),
-                                    compressed_fname)
-            spr.call(['gzip', '-d', compressed_fname] + (['-k'] * keep))
+        if not missing:
+            return
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        # downloading and decompressing is I/O bound, so we process multiple
+        # files at the same time
+        with ThreadPoolExecutor(min(8, len(missing))) as executor:
+            futures = [
+                executor.submit(self._download_file, yrmon, fname, force,
+                                keep)
+                for yrmon, fname in missing.items()]
+            for future in as_completed(futures):
+                logger.debug('    Done with %s', future.result())
 
     def setup_from_file(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'year', 'month', 'day', 'hour']
+        kwargs['dtype'] = self.dtypes
         return super(HourlyCloud, self).setup_from_file(*args, **kwargs)
 
     def setup_from_db(self, *args, **kwargs):
@@ -1455,19 +2345,21 @@ class HourlyCloud(CloudParameterizerBase):
         """Set up the data"""
         if self.args_type == 'files':
             from gwgen.parse_eecra import parse_file
-            self.data = pd.concat(list(map(parse_file, self.stations))).rename(
-                columns={'station_id': 'id'})
+            self.data = pd.concat(list(map(parse_file, self.stations))).astype(
+                self.dtypes).rename(columns={'station_id': 'id'})
             self.data.set_index(['id', 'year', 'month', 'day', 'hour'],
                                 inplace=True)
             self.data.sort_index(inplace=True)
         else:
-            files = self.src_files
-            df_map = pd.DataFrame(
-                np.vstack([self.stations, self.eecra_stations]).T,
-                columns=['id', 'station_id'])
+            # multiple GHCN stations might use the same EECRA station, but
+            # we read every file only once and merge the GHCN ids at the end
+            files = list(OrderedDict.fromkeys(self.src_files))
+            df_map = pd.DataFrame(OrderedDict([
+                ('id', self.stations), ('station_id', self.eecra_stations)]))
             self.data = pd.concat(
-                [pd.read_csv(fname).merge(df_map, on='station_id', how='inner')
-                 for fname in files], ignore_index=False, copy=False)
+                [pd.read_csv(fname, dtype=self.dtypes) for fname in files],
+                ignore_index=True, copy=False).merge(
+                    df_map, on='station_id', how='inner')
             self.data.set_index(['id', 'year', 'month', 'day', 'hour'],
                                 inplace=True)
             self.data.sort_index(inplace=True)
@@ -1491,19 +2383,34 @@ class DailyCloud(CloudParameterizerBase):
 
     @staticmethod
     def calculate_daily(df):
+        """
+        Calculate the daily summaries of hourly data
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The hourly data with ``'ww'``, ``'AT'``, ``'N'`` and ``'WS'``
+            columns and an index with ``'id'``, ``'year'``, ``'month'`` and
+            ``'day'`` levels
+
+        Returns
+        -------
+        pandas.DataFrame
+            The summary for each station and day"""
+        levels = ['id', 'year', 'month', 'day']
         ww = df.ww.values
-        at = df.AT
+        # missing values (-1 or NaN) are not wet
+        valid = (ww >= 0) & (ww < len(_wet_ww))
+        wet = np.zeros(len(ww), dtype=bool)
+        wet[valid] = _wet_ww[ww[valid].astype(int)]
+        wet = pd.Series(wet, index=df.index)
+        g = df.groupby(level=levels)
         return pd.DataFrame.from_dict(OrderedDict([
-            ('wet_day', [(
-                ((ww >= 50) & (ww <= 75)) |
-                (ww == 75) |
-                (ww == 77) |
-                (ww == 79) |
-                ((ww >= 80) & (ww <= 99))).any().astype(int)]),
-            ('tmin', [at.min()]),
-            ('tmax', [at.max()]),
-            ('mean_cloud', [df.N.mean() / 8.]),
-            ('wind', [df.WS.mean()])
+            ('wet_day', wet.groupby(level=levels).any().astype(int)),
+            ('tmin', g.AT.min()),
+            ('tmax', g.AT.max()),
+            ('mean_cloud', g.N.mean() / 8.),
+            ('wind', g.WS.mean())
             ]))
 
     def setup_from_file(self, *args, **kwargs):
@@ -1516,10 +2423,19 @@ class DailyCloud(CloudParameterizerBase):
 
     def setup_from_scratch(self):
         df = self.hourly_cloud.data
-        data = df.groupby(level=['id', 'year', 'month', 'day']).apply(
-            self.calculate_daily)
-        data.index = data.index.droplevel(-1)
-        self.data = data
+        if njit is None:
+            self.data = self.calculate_daily(df)
+            return
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        starts = _group_starts(df.index, ['id', 'year', 'month', 'day'])
+        arrays = [_kernel_array(df[col].values)
+                  for col in ['ww', 'AT', 'N', 'WS']]
+        self.data = pd.DataFrame(
+            _daily_cloud_props(*arrays, starts=starts),
+            columns=['wet_day', 'tmin', 'tmax', 'mean_cloud', 'wind'],
+            index=df.index[starts[:-1]].droplevel('hour'))
+        self.data['wet_day'] = self.data['wet_day'].astype(int)
 
 
 class MonthlyCloud(CloudParameterizerBase):
@@ -1552,29 +2468,51 @@ class MonthlyCloud(CloudParameterizerBase):
 
     @staticmethod
     def calculate_monthly(df):
-        if len(df) > 1:
-            wet = df.wet_day.values.astype(bool)
-            return pd.DataFrame.from_dict(OrderedDict([
-                ('wet_day', [df.wet_day.sum()]),
-                ('mean_cloud_wet', [df.mean_cloud.ix[wet].mean()]),
-                ('mean_cloud_dry', [df.mean_cloud.ix[~wet].mean()]),
-                ('mean_cloud', [df.mean_cloud.mean()]),
-                ('sd_cloud_wet', [df.mean_cloud.ix[wet].std()]),
-                ('sd_cloud_dry', [df.mean_cloud.ix[~wet].std()]),
-                ('sd_cloud', [df.mean_cloud.std()]),
-                ('wind_wet', [df.wind.ix[wet].mean()]),
-                ('wind_dry', [df.wind.ix[~wet].mean()]),
-                ('wind', [df.wind.mean()]),
-                ('sd_wind_wet', [df.wind.ix[wet].std()]),
-                ('sd_wind_dry', [df.wind.ix[~wet].std()]),
-                ('sd_wind', [df.wind.std()]),
-                ]))
-        else:
-            return pd.DataFrame([], columns=[
-                'wet_day', 'mean_cloud_wet', 'mean_cloud_dry',
-                'mean_cloud', 'sd_cloud_wet', 'sd_cloud_dry', 'sd_cloud',
-                'wind_wet', 'wind_dry',
-                'wind', 'sd_wind_wet', 'sd_wind_dry', 'sd_wind'])
+        """
+        Calculate the monthly summaries of daily data
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The daily data with ``'wet_day'``, ``'mean_cloud'`` and
+            ``'wind'`` columns and an index with ``'id'``, ``'year'`` and
+            ``'month'`` levels
+
+        Returns
+        -------
+        pandas.DataFrame
+            The summary for each station and month with more than one day"""
+        levels = ['id', 'year', 'month']
+        wet = df.wet_day.values.astype(bool)
+        # the values on wet and dry days, the NaNs are ignored in the
+        # statistics
+        values = OrderedDict()
+        for col in ['mean_cloud', 'wind']:
+            values[col + '_wet'] = df[col].where(wet)
+            values[col + '_dry'] = df[col].where(~wet)
+            values[col] = df[col]
+        cols = list(values)
+        values['wet_day'] = df.wet_day
+        # use one groupby object, such that the groups are only computed once
+        g = pd.DataFrame(values).groupby(level=levels)
+        means = g[cols].mean()
+        stds = g[cols].std()
+        data = pd.DataFrame.from_dict(OrderedDict([
+            ('wet_day', g['wet_day'].sum()),
+            ('mean_cloud_wet', means.mean_cloud_wet),
+            ('mean_cloud_dry', means.mean_cloud_dry),
+            ('mean_cloud', means.mean_cloud),
+            ('sd_cloud_wet', stds.mean_cloud_wet),
+            ('sd_cloud_dry', stds.mean_cloud_dry),
+            ('sd_cloud', stds.mean_cloud),
+            ('wind_wet', means.wind_wet),
+            ('wind_dry', means.wind_dry),
+            ('wind', means.wind),
+            ('sd_wind_wet', stds.wind_wet),
+            ('sd_wind_dry', stds.wind_dry),
+            ('sd_wind', stds.wind),
+            ]))
+        return data[(g.size() > 1).values]
 
     def setup_from_file(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'year', 'month']
@@ -1582,26 +2520,24 @@ class MonthlyCloud(CloudParameterizerBase):
 
     def setup_from_db(self, *args, **kwargs):
         kwargs['index_col'] = ['id', 'year', 'month']
-        return super(MonthlyCloud, self).setup_from_db(*args, **kwargs)
+        super(MonthlyCloud, self).setup_from_db(*args, **kwargs)
+        _bool_complete_cols(self.data)
 
     def setup_from_scratch(self):
         df = self.daily_cloud.data
-        g = df.groupby(level=['id', 'year', 'month'])
-        data = g.apply(self.calculate_monthly)
-        # wet_day might be converted due to empty dataframe
+        data = self.calculate_monthly(df)
+        # wet_day might be a float column if the daily data comes from a file
         data['wet_day'] = data['wet_day'].astype(int)
-        data.index = data.index.droplevel(-1)
-        # number of records per month
-        df_nums = g.count()
-        df_nums['day'] = 1
-        s = pd.to_datetime(df_nums.reset_index()[['year', 'month', 'day']])
-        s.index = df_nums.index
-        df_nums['ndays'] = ((s + pd.datetools.thisMonthEnd) - s).dt.days + 1
+        # number of records per month (the order does not matter because we
+        # merge them by the index)
+        df_nums = df.groupby(level=['id', 'year', 'month'],
+                             sort=False).count()
+        ndays = _days_in_month(df_nums.index.get_level_values('year'),
+                               df_nums.index.get_level_values('month'))
         cols = ['wet_day', 'tmin', 'tmax', 'mean_cloud', 'wind']
         complete_cols = [col + '_complete' for col in cols]
         for col, tcol in zip(cols, complete_cols):
-            df_nums[tcol] = df_nums[col] == df_nums.ndays
-        df_nums.drop('day', 1, inplace=True)
+            df_nums[tcol] = df_nums[col].values == ndays
 
         self.data = pd.merge(
             data, df_nums[complete_cols], left_index=True,
@@ -1659,11 +2595,43 @@ class CompleteMonthlyCloud(MonthlyCloud):
 
     cols = ['wet_day', 'mean_cloud']  # not 'tmin', 'tmax'
 
+    #: The :attr:`data` and a mapping from column to the yearly completeness
+    #: of this column as computed by :meth:`complete_years`
+    _complete_years_cache = None
+
     def setup_from_scratch(self):
         cols = self.cols
         complete_cols = [col + '_complete' for col in cols]
-        self.data = self.monthly_cloud.data[
-            self.monthly_cloud.data[complete_cols].values.all(axis=1)]
+        monthly = self.monthly_cloud.data
+        self.data = monthly[_complete_mask(monthly, complete_cols)]
+
+    def complete_years(self, cols):
+        """Get the completeness of the years in the :attr:`data`
+
+        The completeness of each column is only computed once and then
+        shared between the tasks that use this one
+
+        Parameters
+        ----------
+        cols: list of str
+            The boolean columns in the :attr:`data` that mark the complete
+            months
+
+        Returns
+        -------
+        pandas.DataFrame
+            The frame of :func:`_complete_years` for the :attr:`data`"""
+        data = self.data
+        cache = self._complete_years_cache
+        if cache is None or cache[0] is not data:
+            cache = self._complete_years_cache = (data, {})
+        missing = [col for col in cols if col not in cache[1]]
+        if missing:
+            yearly = _complete_years(data, missing)
+            for col in missing:
+                cache[1][col] = yearly[col + '_year'].values
+        return pd.DataFrame(OrderedDict(
+            (col + '_year', cache[1][col]) for col in cols), index=data.index)
 
 
 class YearlyCompleteMonthlyCloud(CompleteMonthlyCloud):
@@ -1684,26 +2652,16 @@ class YearlyCompleteMonthlyCloud(CompleteMonthlyCloud):
     cols = ['wet_day', 'mean_cloud']  # not 'tmin', 'tmax'
 
     def setup_from_scratch(self):
-        def year_complete(series):
-            """Check whether the data for the given is complete"""
-            return series.astype(int).sum() == 12
-        all_monthly = self.cmonthly_cloud.data
-
         cols = self.cols
 
         complete_cols = [col + '_complete' for col in cols]
 
-        df_yearly = all_monthly[complete_cols].groupby(
-            level=['id', 'year']).agg(year_complete)
-
-        names = all_monthly.index.names
-        all_monthly = all_monthly.reset_index().merge(
-            df_yearly[complete_cols].reset_index(), on=['id', 'year'],
-            suffixes=['', '_year']).set_index(names)
+        all_monthly = pd.concat([
+            self.cmonthly_cloud.data,
+            self.cmonthly_cloud.complete_years(complete_cols)], axis=1)
 
         ycomplete_cols = [col + '_complete_year' for col in cols]
-        self.data = all_monthly.ix[
-            all_monthly[ycomplete_cols].values.all(axis=1)]
+        self.data = all_monthly[_complete_mask(all_monthly, ycomplete_cols)]
 
 
 class CloudParameterizer(CompleteMonthlyCloud):
@@ -1737,6 +2695,9 @@ class CloudParameterizer(CompleteMonthlyCloud):
 
     has_run = True
 
+    #: The :attr:`data` and the dataset that :attr:`ds` created from it
+    _ds_cache = None
+
     namelist_keys = {
         'cldf_w': 'mean_cloud_wet.a',
         'cldf_d': 'mean_cloud_dry.a',
@@ -1769,7 +2730,13 @@ class CloudParameterizer(CompleteMonthlyCloud):
         """The dataframe of this parameterization task converted to a dataset
         """
         import xarray as xr
-        ds = xr.Dataset.from_dataframe(self.data.reset_index())
+        data = self.data
+        if self._ds_cache is None or self._ds_cache[0] is not data:
+            self._ds_cache = (
+                data, xr.Dataset.from_dataframe(data.reset_index()))
+        # a shallow copy that shares the data with the cached dataset but not
+        # the attributes
+        ds = self._ds_cache[1].copy()
         for t, state in product(['sd', 'mean'], ['', 'wet', 'dry']):
             vname = t + '_cloud' + (('_' + state) if state else '')
             varo = ds.variables[vname]
@@ -1782,10 +2749,27 @@ class CloudParameterizer(CompleteMonthlyCloud):
         return ds
 
     def setup_from_scratch(self):
-        g = self.cmonthly_cloud.data.groupby(level=['id', 'month'])
-        data = g.mean()
+        data = self.cmonthly_cloud.data
         cols = [col for col in data.columns if '_complete' not in col]
-        self.data = data[cols]
+        if njit is None:
+            self.data = data[cols].groupby(level=['id', 'month']).mean()
+            return
+        # compute the means of all columns in one pass through the data. The
+        # kernel runs serial because the stations are already distributed
+        # over the worker processes of the TaskManager (see
+        # :attr:`setup_parallel`)
+        id_codes, ids = _sorted_level_codes(data.index, 'id')
+        month_codes, months = _sorted_level_codes(data.index, 'month')
+        keys = id_codes * len(months) + month_codes
+        used = np.bincount(keys, minlength=len(ids) * len(months)) > 0
+        groups = np.flatnonzero(used)
+        means = _group_means((np.cumsum(used, dtype=np.intp) - 1)[keys],
+                             _kernel_array(data[cols].values),
+                             len(groups))
+        index = pd.MultiIndex.from_arrays(
+            [ids[groups // len(months)], months[groups % len(months)]],
+            names=['id', 'month'])
+        self.data = pd.DataFrame(means, index=index, columns=cols)
 
     @docstrings.dedent
     def create_project(self, ds):
@@ -1835,18 +2819,18 @@ class CloudParameterizer(CompleteMonthlyCloud):
         ----------
         %(Parameterizer.make_run_config.parameters)s
         """
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
+        nml = full_nml.setdefault('weathergen_ctl', {})
         states = ['wet', 'dry']
         types = ['mean', 'sd']
+        plotters = _plotters_by_name(sp)
         for t, state in product(types, states):
             vname = '%s_cloud_%s' % (t, state)
             nml_name = 'cldf%s_%s' % ("_sd" if t == 'sd' else '', state[:1])
             info[vname] = vinfo = {}
-            plotter = sp(name=vname).plotters[0]
+            attrs = plotters[vname].plot_data[1].attrs
             for key in ['a', 'a_err']:
-                vinfo[key] = float(plotter.plot_data[1].attrs[key])
-            nml[nml_name] = float(
-                plotter.plot_data[1].attrs.get('a', 0))
+                vinfo[key] = float(attrs[key])
+            nml[nml_name] = float(attrs.get('a', 0))
 
 
 class CompleteMonthlyWind(CompleteMonthlyCloud):
@@ -1972,17 +2956,12 @@ class WindParameterizer(CompleteMonthlyWind):
         return ds
 
     def setup_from_scratch(self):
-        def mean(s):
-            try:
-                return s.mean()
-            except:
-                return np.nan
         all_data = self.cmonthly_wind.data
         cols = [col for col in all_data.columns if '_complete' not in col]
-        g = all_data[cols].groupby(level=['id', 'month'])
-        # HACK: somehow g.mean() turned into an Error
-        data = g.agg(mean)
-        self.data = data
+        # cast to float, because g.mean() failed for columns that were not
+        # recognized as numeric
+        g = all_data[cols].astype(float).groupby(level=['id', 'month'])
+        self.data = g.mean()
 
     @docstrings.dedent
     def create_project(self, ds):
@@ -2030,20 +3009,19 @@ class WindParameterizer(CompleteMonthlyWind):
         ----------
         %(Parameterizer.make_run_config.parameters)s
         """
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
+        nml = full_nml.setdefault('weathergen_ctl', {})
         states = ['wet', 'dry']
         types = ['', 'sd_']
+        plotters = _plotters_by_name(sp)
         for t, state in product(types, states):
             vname = '%swind_%s' % (t, state)
             nml_name = 'wind%s_%s' % ("_sd" if t == 'sd_' else '', state[:1])
             info[vname] = vinfo = {}
-            plotter = sp(name=vname).plotters[0]
+            attrs = plotters[vname].plot_data[1].attrs
             for key in ['rsquared', 'slope', 'intercept']:
-                vinfo[key] = float(plotter.plot_data[1].attrs[key])
-            nml[nml_name + '1'] = float(
-                plotter.plot_data[1].attrs.get('intercept', 0))
-            nml[nml_name + '2'] = float(
-                plotter.plot_data[1].attrs.get('slope'))
+                vinfo[key] = float(attrs[key])
+            nml[nml_name + '1'] = float(attrs.get('intercept', 0))
+            nml[nml_name + '2'] = float(attrs.get('slope'))
 
 
 class CompleteDailyCloud(DailyCloud):
@@ -2069,11 +3047,9 @@ class CompleteDailyCloud(DailyCloud):
         monthly = self.monthly_cloud.data
         cols = self.cols
         complete_cols = [col + '_complete' for col in cols]
-        self.data = self.daily_cloud.data.reset_index().merge(
-            monthly[
-                monthly[complete_cols].values.all(axis=1)][[]].reset_index(),
-            how='inner', on=['id', 'year', 'month'], copy=False).set_index(
-                ['id', 'year', 'month', 'day'])
+        months = monthly.index[_complete_mask(monthly, complete_cols)]
+        days = self.daily_cloud.data
+        self.data = days[days.index.droplevel('day').isin(months)]
 
 
 class YearlyCompleteDailyCloud(CompleteDailyCloud):
@@ -2096,29 +3072,50 @@ class YearlyCompleteDailyCloud(CompleteDailyCloud):
     cols = ['wet_day', 'mean_cloud', 'tmin', 'tmax', 'wind']
 
     def setup_from_scratch(self):
-        def year_complete(series):
-            """Check whether the data for the given is complete"""
-            return series.astype(int).sum() == 12
-        all_monthly = self.cmonthly_cloud.data
-
-        cols = self.cols
+        complete_cols = [col + '_complete' for col in self.cols]
+        # we only need the months, so we do not add the yearly completeness
+        # to a copy of the monthly data
+        yearly = self.cmonthly_cloud.complete_years(complete_cols)
+        months = yearly.index[_complete_mask(yearly, yearly.columns)]
+        days = self.cdaily_cloud.data
+        self.data = days[days.index.droplevel('day').isin(months)]
 
-        complete_cols = [col + '_complete' for col in cols]
 
-        df_yearly = all_monthly[complete_cols].groupby(
-            level=['id', 'year']).agg(year_complete)
+def _pairwise_corr(x, y):
+    """Compute the correlation between the columns of two arrays
 
-        names = all_monthly.index.names
-        all_monthly = all_monthly.reset_index().merge(
-            df_yearly[complete_cols].reset_index(), on=['id', 'year'],
-            suffixes=['', '_year']).set_index(names)
+    As in :meth:`pandas.Series.corr`, the Pearson correlation of two columns
+    only considers the rows where both columns are not NaN
 
-        ycomplete_cols = [col + '_complete_year' for col in cols]
-        monthly = all_monthly.ix[
-            all_monthly[ycomplete_cols].values.all(axis=1)][[]].reset_index()
-        self.data = self.cdaily_cloud.data.reset_index().merge(
-            monthly, how='inner', on=['id', 'year', 'month'],
-            copy=False).set_index(['id', 'year', 'month', 'day'])
+    Parameters
+    ----------
+    x: np.ndarray
+        The ``(N, n)`` array
+    y: np.ndarray
+        The ``(N, m)`` array
+
+    Returns
+    -------
+    np.ndarray
+        The ``(n, m)`` array with the correlation of ``x[:, i]`` and
+        ``y[:, j]`` at position ``i, j``"""
+    mx = ~np.isnan(x)
+    my = ~np.isnan(y)
+    # center the data to reduce the cancellation in the sums below
+    x = np.where(mx, x - np.nanmean(x, axis=0), 0)
+    y = np.where(my, y - np.nanmean(y, axis=0), 0)
+    mx = mx.astype(float)
+    my = my.astype(float)
+    # the sums over the rows that are valid in both columns of each pair
+    n = np.dot(mx.T, my)
+    sx = np.dot(x.T, my)
+    sy = np.dot(mx.T, y)
+    sxx = np.dot((x * x).T, my)
+    syy = np.dot(mx.T, y * y)
+    sxy = np.dot(x.T, y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (n * sxy - sx * sy) / np.sqrt(
+            (n * sxx - sx * sx) * (n * syy - sy * sy))
 
 
 class CrossCorrelation(Parameterizer):
@@ -2166,56 +3163,65 @@ class CrossCorrelation(Parameterizer):
         self.data = pd.read_sql_table(self.dbname, self.engine, **kwargs)
         self.data.columns.name = 'variable'
 
-    def setup_from_scratch(self):
-        import dask.dataframe as dd
-        if not self.global_config.get('serial'):
-            from dask.multiprocessing import get
-            nprocs = self.global_config.get('nprocs', 'all')
-            if nprocs == 'all':
-                import multiprocessing as mp
-                nprocs = mp.cpu_count()
-            kws = {'num_workers': nprocs}
-        else:
-            from dask.async import get_sync as get
-            kws = {}
-        df = self.yearly_cdaily_cloud.data.sort_index()
-        df['wind'] = df['wind'] ** 0.5
-        df['date'] = vals = pd.to_datetime(df[[]].reset_index().drop('id', 1))
-        df['date'].values[:] = vals
-        df.set_index('date', inplace=True)
-        chunksize = self.global_config.get('chunksize', 10 ** 6)
-        ddf = dd.from_pandas(df, chunksize=chunksize)
-        cols = self.cols
-        # m0
-        self.data = final = ddf[cols].corr().compute(get=get, **kws)
-        final.index.name = 'variable'
-        # make sure that the index is ignored
-        shifted = df.copy()
-        shifted.iloc[1:, :] = shifted.iloc[:-1].values
+    @staticmethod
+    def calculate_correlations(df, cols):
+        """
+        Calculate the correlation matrices of the daily weather variables
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            The sorted daily data with the `cols` and an index with
+            ``'month'`` and ``'day'`` levels. The square root of the
+            ``'wind'`` is used
+        cols: list of str
+            The variables to correlate
+
+        Returns
+        -------
+        pandas.DataFrame
+            The correlations between the `cols` (M0) and, in the columns with
+            the ``'1'`` suffix, the correlations with the previous day (M1).
+            ``data.loc[r, c + '1']`` is the correlation of ``c`` with ``r`` of
+            the previous day"""
+        # astype copies the data, so we do not modify the input data
+        values = df[cols].values.astype(np.float64)
+        if 'wind' in cols:
+            wind = values[:, cols.index('wind')]
+            wind **= 0.5
+        # the values of the previous day
+        shifted = np.r_[values[:1], values[:-1]]
         # set last day of year to NaN
-        shifted.iloc[(shifted.index.month == 12) &
-                     (shifted.index.day == 31)] = np.nan
-        dshifted = dd.from_pandas(shifted, chunksize=chunksize)
-        # m1
-        for col in cols:
-            final[col + '1'] = 0
-            for col2 in cols:
-                final.loc[col2, col + '1'] = ddf[col].corr(
-                    dshifted[col2]).compute(get=get, **kws)
-                final.columns.name = 'variable'
+        shifted[(df.index.get_level_values('month') == 12) &
+                (df.index.get_level_values('day') == 31)] = np.nan
+        # m0 and m1 in one pass through the data. corr[i, n + j] is the
+        # correlation of the i-th variable with the j-th of the previous day,
+        # so we transpose this block for M1
+        n = len(cols)
+        corr = _pairwise_corr(values, np.hstack([values, shifted]))
+        return pd.DataFrame(
+            np.hstack([corr[:, :n], corr[:, n:].T]),
+            index=pd.Index(cols, name='variable'),
+            columns=pd.Index(cols + [col + '1' for col in cols],
+                             name='variable'))
+
+    def setup_from_scratch(self):
+        df = self.yearly_cdaily_cloud.data
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        self.data = self.calculate_correlations(df, self.cols)
 
     def run(self, info, full_nml):
         cols = self.cols
         lag1_cols = [col + '1' for col in cols]
-        nml = full_nml.setdefault('weathergen_ctl', OrderedDict())
-        m0 = self.data[cols]
-        m1 = self.data[lag1_cols].rename(columns=dict(zip(lag1_cols, cols)))
-        m0i = np.linalg.inv(m0)
-        nml['a'] = np.dot(m1, m0i).tolist()
-        nml['b'] = np.linalg.cholesky(
-            m0 - np.dot(np.dot(m1, m0i), m1.T)).tolist()
-        info['M0'] = m0.values.tolist()
-        info['M1'] = m1.values.tolist()
+        nml = full_nml.setdefault('weathergen_ctl', {})
+        m0 = self.data[cols].values.astype(np.float64)
+        m1 = self.data[lag1_cols].values.astype(np.float64)
+        a = np.dot(m1, np.linalg.inv(m0))
+        nml['a'] = a.tolist()
+        nml['b'] = np.linalg.cholesky(m0 - np.dot(a, m1.T)).tolist()
+        info['M0'] = m0.tolist()
+        info['M1'] = m1.tolist()
 
     @classmethod
     def _modify_parser(cls, parser):
@@ -1,20 +1,46 @@
 # -*- coding: utf-8 -*-
 from gwgen._parseghcnrow import parseghcnrow
-import six
 import pandas as pd
 import numpy as np
+import os.path as osp
 from itertools import chain
-import datetime as dt
 import re
 
-if six.PY2:
-    from itertools import imap as map, izip as zip
-
 daymon_patt = re.compile(r'(?:\w|-){11}(\d{6})(?:TMAX|TMIN|PRCP)')
 
+#: pattern to find the months of the variables in the entire content of a file
+_file_daymon_patt = re.compile(
+    br'^(?:\w|-){11}(\d{6})(?:TMAX|TMIN|PRCP)', re.MULTILINE)
 
-def read_ghcn_file(ifile):
-    """Read in a GHCN station data file and convert it to a dataframe
+#: The number of days of each month in a non-leap year (the first entry is a
+#: placeholder such that the array can be indexed by the month)
+_month_lengths = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+_vlst = ['tmin', 'tmax', 'prcp']
+
+
+def _days_in_month(years, months):
+    """Get the number of days in the given months
+
+    Parameters
+    ----------
+    years: np.ndarray of int
+        The years
+    months: np.ndarray of int
+        The months (from 1 to 12) corresponding to `years`
+
+    Returns
+    -------
+    np.ndarray of int
+        The number of days of each month"""
+    years = np.asarray(years)
+    months = np.asarray(months)
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    return _month_lengths[months] + (leap & (months == 2))
+
+
+def _read_ghcn_arrays(ifile):
+    """Parse a GHCN station data file into arrays
 
     Parameters
     ----------
@@ -23,29 +49,97 @@ def read_ghcn_file(ifile):
 
     Returns
     -------
-    pandas.DataFrame
-        The `ifile` converted to a dataframe"""
-    # get number of days in the file
-    with open(ifile) as f:
-        ndays = np.sum(list(map(ndaymon, np.unique(list(map(
-            lambda m: m.group(1), filter(
-                None, map(daymon_patt.match, f.readlines()))))))))
+    str
+        The station id
+    np.ndarray
+        The ``(N, 3)`` array of year, month and day
+    np.ndarray
+        The ``(N, 3)`` array of tmin, tmax and prcp
+    np.ndarray
+        The ``(N, 3, 3)`` array of flags"""
+    # get number of days in the file with one scan through the content
+    with open(ifile, 'rb') as f:
+        yearmons = np.unique(np.array(
+            _file_daymon_patt.findall(f.read()), dtype=int))
+    if not len(yearmons):
+        # a file without data. The station id is then taken from the file
+        # name (``<id>.dly``)
+        return (osp.splitext(osp.basename(ifile))[0],
+                np.zeros((0, 3), dtype=np.int32),
+                np.zeros((0, 3), dtype=np.float32),
+                np.zeros((0, 3, 3), dtype='S1'))
+    ndays = int(_days_in_month(*np.divmod(yearmons, 100)).sum())
     stationid, dates, variables, flags, j = parseghcnrow.parse_station(
-        ifile, ndays or 100)
-    dates = dates[:j]
-    variables = variables[:j].astype(np.float64)
-    flags = flags[:j].astype(np.str_)
-    flags = np.core.defchararray.replace(flags, ' ', '')
+        ifile, ndays)
+    return stationid, dates[:j], variables[:j], flags[:j]
+
+
+def _to_dataframe(stationids, dates, variables, flags):
+    """Convert the parsed GHCN arrays into a dataframe
+
+    Parameters
+    ----------
+    stationids: np.ndarray
+        The station id for each day
+    dates, variables, flags: np.ndarray
+        The arrays as returned by :func:`_read_ghcn_arrays`
+
+    Returns
+    -------
+    pandas.DataFrame
+        The data frame with the station ids, the dates, the variables and
+        their flags"""
+    variables = variables.astype(np.float32)
+    flags = np.char.replace(flags.astype(np.str_), ' ', '')
     variables[np.isclose(variables, -9999.) |
               np.isclose(variables, -999.9)] = np.nan
-    vlst = ['tmin', 'tmax', 'prcp']
-    df = pd.DataFrame.from_dict(dict(chain(
-        [('id', np.repeat(np.array([stationid]).astype(np.str_), j))],
+    return pd.DataFrame.from_dict(dict(chain(
+        [('id', stationids.astype(np.str_))],
         zip(('year', 'month', 'day'), dates.T),
-        zip(vlst, variables.T),
-        chain(*[zip((var + '_m', var + '_q', var + '_s'), arr)
-                for var, arr in zip(vlst, np.rollaxis(flags, 2, 1).T)]))))
-    return df
+        zip(_vlst, variables.T),
+        chain.from_iterable(
+            zip((var + '_m', var + '_q', var + '_s'), arr)
+            for var, arr in zip(_vlst, np.rollaxis(flags, 2, 1).T)))))
+
+
+def read_ghcn_file(ifile):
+    """Read in a GHCN station data file and convert it to a dataframe
+
+    Parameters
+    ----------
+    ifile: str
+        The path to a ghcn datafile
+
+    Returns
+    -------
+    pandas.DataFrame
+        The `ifile` converted to a dataframe"""
+    stationid, dates, variables, flags = _read_ghcn_arrays(ifile)
+    return _to_dataframe(np.repeat(np.array([stationid]), len(dates)),
+                         dates, variables, flags)
+
+
+def read_ghcn_files(files):
+    """Read in multiple GHCN station data files into one dataframe
+
+    Other than concatenating the results of :func:`read_ghcn_file`, this
+    function concatenates the parsed arrays and creates the dataframe only
+    once
+
+    Parameters
+    ----------
+    files: list of str
+        The paths to the ghcn datafiles
+
+    Returns
+    -------
+    pandas.DataFrame
+        The data of all `files`"""
+    stationids, dates, variables, flags = zip(*map(_read_ghcn_arrays, files))
+    return _to_dataframe(
+        np.repeat(np.array(stationids), list(map(len, dates))),
+        np.concatenate(dates), np.concatenate(variables),
+        np.concatenate(flags))
 
 
 def ndaymon(yearmon):
@@ -56,10 +150,4 @@ def ndaymon(yearmon):
     yearmon: str
         The first 4 numbers stand for the year, the others for the month
         (in datetime writing: ``'%Y%m'``)"""
-    year = int(yearmon[:4])
-    month = int(yearmon[4:])
-    d = dt.date(year, month, 1)
-    d2 = d.replace(
-        year=year + 1 if month == 12 else year,
-        month=1 if month == 12 else month + 1)
-    return (d2 - d).days
+    return int(_days_in_month(int(yearmon[:4]), int(yearmon[4:])))
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Module for a sensitivity analysis for one experiment"""
 import os
-import six
 from functools import partial
 from argparse import Namespace
 import yaml
@@ -10,18 +9,29 @@ from collections import namedtuple
 from itertools import product, chain, repeat, starmap
 import logging
 import numpy as np
-from gwgen.main import OrderedDict, GWGENOrganizer
+from gwgen.main import GWGENOrganizer
 import gwgen.utils as utils
 from gwgen.utils import isstring, docstrings
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 class SensitivityAnalysis(object):
     """Class that performs and manages a sensitivity analysis for the given
     organizer"""
 
+    _logger = None
+
     @property
     def logger(self):
-        return logging.getLogger('%s.%s' % (__name__, self.__class__.__name__))
+        """The logger of this analysis"""
+        if self._logger is None:
+            self._logger = logging.getLogger(
+                '%s.%s' % (__name__, self.__class__.__name__))
+        return self._logger
 
     @property
     def experiment(self):
@@ -40,8 +50,7 @@ class SensitivityAnalysis(object):
     @property
     def config(self):
         """The configuration of the sensitivity analysis"""
-        return self.exp_config.setdefault('sensitivity_analysis',
-                                          OrderedDict())
+        return self.exp_config.setdefault('sensitivity_analysis', {})
 
     @property
     def projectname(self):
@@ -56,7 +65,7 @@ class SensitivityAnalysis(object):
     def project_config(self):
         """The project configuration of the sensitivity analysis"""
         return self.organizer.config.projects.setdefault(self.projectname,
-                                                         OrderedDict())
+                                                         {})
 
     @property
     def sa_organizer(self):
@@ -110,8 +119,8 @@ class SensitivityAnalysis(object):
             with open(experiments[0]) as f:
                 experiments = [l.rstrip() for l in f.readlines()]
         config = self.organizer.global_config
-        commands = self.organizer.commands + list(
-            self.organizer.parser_commands.values())
+        commands = set(chain(self.organizer.commands,
+                             self.organizer.parser_commands.values()))
         if not loop_exps and not config.get('serial'):
             all_kws = (
                 {key: dict(chain([('experiment', exp)], kws[key].items()))
@@ -119,18 +128,20 @@ class SensitivityAnalysis(object):
                 for exp in experiments)
             nprocs = config.get('nprocs', 'all')
             if nprocs == 'all':
-                nprocs = mp.cpu_count()
+                nprocs = utils.cpu_count()
+            nprocs = max(1, min(nprocs, len(experiments)))
             config['serial'] = True
             self.logger.debug('Starting %i processes', nprocs)
-            pool = mp.Pool(nprocs)
-            res = pool.map_async(self, all_kws)
-            for (organizer, ns), experiment in zip(res.get(), experiments):
+            try:
+                with mp.Pool(nprocs) as pool:
+                    res = pool.map(self, all_kws)
+                    pool.close()
+                    pool.join()
+            finally:
+                config['serial'] = False
+            for (organizer, ns), experiment in zip(res, experiments):
                 changed = organizer.config.experiments[experiment]
                 self.organizer.config.experiments[experiment] = changed
-            config['serial'] = False
-            pool.close()
-            pool.join()
-            pool.terminate()
         else:
             for experiment in experiments or self.experiments:
                 for key, val in kws.items():
@@ -195,7 +206,7 @@ class SensitivityAnalysis(object):
         organizer.start(setup=dict(
             root_dir=root_dir, projectname=projectname, link=link,
             src_project=self.organizer.projectname))
-        if not six.PY2 and not no_move:
+        if not no_move:
             utils.ordered_move(organizer.config.projects, projectname,
                                self.organizer.projectname)
 
@@ -262,14 +273,17 @@ class SensitivityAnalysis(object):
                     'database']
 
         def update_nml():
+            """Fill the namelist of the new experiment with the settings of
+            the base experiment"""
+            exp_nml = organizer.exp_config['namelist']
             for nml_key, settings in self.exp_config.get(
                     'namelist', {}).items():
-                for key, val in settings.items():
-                    organizer.exp_config['namelist'][nml_key].setdefault(
-                        key, val)
+                nml = exp_nml.setdefault(nml_key, {})
+                nml.update((key, val) for key, val in settings.items()
+                           if key not in nml)
 
         def transposed_dict(iterable):
-            return map(OrderedDict, starmap(zip, zip(
+            return map(dict, starmap(zip, zip(
                        repeat(errs.keys()), product(*iterable))))
 
         logger = self.logger
@@ -281,15 +295,15 @@ class SensitivityAnalysis(object):
             raise ValueError(
                 "No parameter ranges specified! Please use the params "
                 "parameter!")
-        nml = OrderedDict(nml)
-        errs = OrderedDict()
-        ranges = OrderedDict()
+        nml = dict(nml)
+        errs = {}
+        ranges = {}
         for key, val in nml.items():
             if any(isstring(s) and 'err' in s for s in val):
                 errs[key] = val
             else:
                 ranges[key] = list(map(float, val))
-        nml = OrderedDict(chain(ranges.items(), errs.items()))
+        nml = dict(chain(ranges.items(), errs.items()))
         self.config['namelist'] = nml.copy()
         self.project_config['sensitivity_namelist'] = nml.copy()
         try:
@@ -305,9 +319,9 @@ class SensitivityAnalysis(object):
                                  "the experiment %s!" % (self.experiment))
             tasks = list(map(Parameterizer.get_task_for_nml_key, errs))
             other_tasks = list(map(Parameterizer.get_task_for_nml_key, ranges))
-            err_bins = OrderedDict()
-            flags = OrderedDict()
-            flags_no_mean = OrderedDict()
+            err_bins = {}
+            flags = {}
+            flags_no_mean = {}
         else:
             tasks = []
         organizer = self.sa_organizer
@@ -326,11 +340,11 @@ class SensitivityAnalysis(object):
             input_file = self.exp_config['input']
             reference = self.exp_config['reference']
 
-        for i, d in enumerate(map(lambda t: OrderedDict(zip(*t)), zip(
+        for i, d in enumerate(map(lambda t: dict(zip(*t)), zip(
                 repeat(ranges.keys()), product(*ranges.values())))):
             experiment = utils.get_next_name(experiment)
             organizer.init(projectname=self.projectname, experiment=experiment)
-            if not six.PY2 and not no_move:
+            if not no_move:
                 utils.ordered_move(organizer.config.experiments, experiment,
                                    self.experiment)
             organizer.exp_config['namelist'] = {'weathergen_ctl': d.copy()}
@@ -373,8 +387,8 @@ class SensitivityAnalysis(object):
 
                 # insert meta information that makes it easier to categorize
                 # the experiments later
-                organizer.exp_config['flags'] = OrderedDict([
-                    (key, 'mean') for key in errs])
+                organizer.exp_config['flags'] = {
+                    key: 'mean' for key in errs}
 
                 errors = {key: param_tasks[t.name].get_error(key)
                           for key, t in zip(errs, tasks)}
@@ -408,11 +422,11 @@ class SensitivityAnalysis(object):
                 for d2, fl in zip(transposed_dict(err_ranges), transposed_dict(
                         flags_no_mean.values())):
                     experiment = utils.get_next_name(experiment)
-                    combined = OrderedDict(chain(d.items(), d2.items()))
+                    combined = dict(chain(d.items(), d2.items()))
                     organizer.start(init=dict(
                         projectname=self.projectname, experiment=experiment,
                         description=base_description.format(*combined)))
-                    if not six.PY2 and not no_move:
+                    if not no_move:
                         utils.ordered_move(
                             organizer.config.experiments, experiment,
                             self.experiment)
@@ -425,13 +439,13 @@ class SensitivityAnalysis(object):
                     organizer.exp_config['base_exp'] = last
                     organizer.exp_config['flags'] = fl
         if errs:
-            self.config['unstructured'] = uconf = OrderedDict()
+            self.config['unstructured'] = uconf = {}
             for err, arr in err_bins.items():
                 minmeanmax = np.zeros((arr.shape[1], 3))
                 minmeanmax[:, 0] = arr.min(axis=0)
                 minmeanmax[:, 1] = arr.mean(axis=0)
                 minmeanmax[:, 2] = arr.max(axis=0)
-                uconf[err] = OrderedDict(zip(flags[key], minmeanmax.tolist()))
+                uconf[err] = dict(zip(flags[key], minmeanmax.tolist()))
                 logger.debug('%s', err)
                 logger.debug('   minima: %s', minmeanmax[:, 0])
                 logger.debug('     mean: %s', minmeanmax[:, 1])
@@ -505,9 +519,9 @@ class SensitivityAnalysis(object):
             Any task of the :class:`SensitivityPlot` framework
         """
         meta = meta or self.config.get('additional_meta')
-        if isinstance(meta, six.string_types):
+        if isinstance(meta, str):
             with open(meta) as f:
-                meta = yaml.load(f)
+                meta = yaml.load(f, Loader=SafeLoader)
         if meta is not None:
             self.config['additional_meta'] = meta
         for task, d in list(kwargs.items()):
@@ -742,7 +756,7 @@ class SensitivityPlot1D(SensitivityPlot):
         indicators = self.task_config.indicators
         nml = self.namelist
         errs = self.err_nml_keys
-        vmeta = OrderedDict([(key, vmeta[key]) for key in ds.vname.values])
+        vmeta = {key: vmeta[key] for key in ds.vname.values}
         for nml_key in nml:
             for i, variable in enumerate(variables):
                 for ind in indicators:
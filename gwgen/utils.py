@@ -4,17 +4,17 @@ import os
 import os.path as osp
 import shutil
 import re
-import six
 import copy
 import logging
 import abc
-from itertools import chain, groupby
+from contextlib import suppress
+from functools import lru_cache
+from itertools import chain, filterfalse
 from collections import namedtuple
 import pandas as pd
 import numpy as np
 import docrep
 from tempfile import mkdtemp
-from psyplot.compat.pycompat import OrderedDict, filterfalse
 from psyplot.config.rcsetup import safe_list
 
 
@@ -27,10 +27,6 @@ float_patt = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
 logger = logging.getLogger(__name__)
 
 
-if six.PY2:
-    FileExistsError = OSError
-
-
 def download_file(url, target=None):
     """Download a file from the internet
 
@@ -49,17 +45,8 @@ def download_file(url, target=None):
     logger.info('Downloading %s to %s', url, target)
     if target is not None and not osp.exists(osp.dirname(target)):
         os.makedirs(osp.dirname(target))
-    if six.PY3:
-        from urllib import request
-        return request.urlretrieve(url, target)[0]
-    else:
-        import urllib
-        ret = urllib.urlretrieve(url, target)[0]
-        # workaround. clean up urls. otherwise you get problems if downloading
-        # more than one file from the same source
-        # (http://bugs.python.org/issue27973)
-        urllib.urlcleanup()
-        return ret
+    from urllib import request
+    return request.urlretrieve(url, target)[0]
 
 
 def dir_contains(dirname, path, exists=True):
@@ -81,16 +68,12 @@ def dir_contains(dirname, path, exists=True):
     if exists:
         dirname = osp.abspath(dirname)
         path = osp.abspath(path)
-        if six.PY3:
-            return osp.samefile(osp.commonpath([dirname, path]), dirname)
-        else:
-            return osp.exists(path) and osp.samefile(
-                osp.commonprefix([dirname, path]), dirname)
+        return osp.samefile(osp.commonpath([dirname, path]), dirname)
     return dirname in osp.commonprefix([dirname, path])
 
 
 def isstring(s):
-    return isinstance(s, six.string_types)
+    return isinstance(s, str)
 
 docstrings.params['str_ranges.s_help'] = """
     A comma (``','``) separated string. A single value in this string
@@ -127,7 +110,7 @@ def str_ranges(s):
         else:
             import numpy as np
             return np.arange(*nums)
-    return list(chain(*map(get_numbers, s.split(','))))
+    return list(chain.from_iterable(map(get_numbers, s.split(','))))
 
 
 def unique_everseen(iterable, key=None):
@@ -150,15 +133,18 @@ def unique_everseen(iterable, key=None):
                 yield element
 
 
+num_patt = re.compile(r'\d+')
+
+
 def get_next_name(old, fmt='%i'):
     """Return the next name that numerically follows `old`"""
-    nums = re.findall('\d+', old)
+    nums = num_patt.findall(old)
     if not nums:
         raise ValueError("Could not get the next name because the old name "
                          "has no numbers in it")
     num0 = nums[-1]
-    num1 = str(int(num0) + 1)
-    return old[::-1].replace(num0[::-1], num1[::-1], 1)[::-1]
+    i = old.rfind(num0)
+    return old[:i] + str(int(num0) + 1) + old[i + len(num0):]
 
 
 docstrings.params['get_value_note'] = """
@@ -333,10 +319,38 @@ def get_postgres_engine(database, user=None, host='127.0.0.1', port=None,
 
 def file_len(fname):
     """Get the number of lines in `fname`"""
-    with open(fname) as f:
-        for i, l in enumerate(f):
-            pass
-    return i + 1
+    # count the line breaks in large binary blocks instead of decoding and
+    # iterating through the single lines
+    n = 0
+    last = b'\n'
+    with open(fname, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            n += block.count(b'\n')
+            last = block[-1:]
+    # the last line might not end with a line break
+    return n + (last != b'\n')
+
+
+@lru_cache(maxsize=None)
+def get_arg_names(func):
+    """Get the names of the arguments that can be passed by keyword to `func`
+
+    The result is cached, such that the signature of `func` is only inspected
+    once
+
+    Parameters
+    ----------
+    func: callable
+        The function to inspect
+
+    Returns
+    -------
+    frozenset
+        The names of the parameters of `func`"""
+    kinds = {inspect.Parameter.POSITIONAL_OR_KEYWORD,
+             inspect.Parameter.KEYWORD_ONLY}
+    return frozenset(name for name, param in inspect.signature(
+        func).parameters.items() if param.kind in kinds)
 
 
 def get_module_path(mod):
@@ -358,15 +372,8 @@ def _requirement_property(requirement):
 
 
 def append_doc(namedtuple_cls, doc):
-    if six.PY3:
-        namedtuple_cls.__doc__ += '\n' + doc
-        return namedtuple_cls
-    else:
-        class DocNamedTuple(namedtuple_cls):
-            __doc__ = namedtuple_cls.__doc__ + '\n' + doc
-            __slots__ = ()
-        DocNamedTuple.__name__ = namedtuple_cls.__name__
-        return DocNamedTuple
+    namedtuple_cls.__doc__ += '\n' + doc
+    return namedtuple_cls
 
 
 _SetupConfig = namedtuple(
@@ -493,6 +500,108 @@ def init_locks(db_locks, file_locks):
 _db_locks = {}
 _file_locks = {}
 
+#: The :class:`TaskManager` of a worker process in
+#: :meth:`TaskManager._setup_parallel`
+_worker_manager = None
+
+#: The start methods that can be used for the worker processes of
+#: :meth:`TaskManager._setup_parallel`
+START_METHODS = ('fork', 'forkserver', 'spawn')
+
+
+def check_start_method(start_method):
+    """Check the start method for the processes of the parallel setup
+
+    Parameters
+    ----------
+    start_method: str
+        One of :attr:`START_METHODS`
+
+    Raises
+    ------
+    ValueError
+        If the `start_method` is not supported"""
+    if start_method not in START_METHODS:
+        raise ValueError(
+            "Unknown start method %r! Possible values are {%s}" % (
+                start_method, ', '.join(map(repr, START_METHODS))))
+
+
+@lru_cache()
+def _get_mp_context(start_method=None, preload=None):
+    """Get the multiprocessing context for the parallel setup
+
+    Parameters
+    ----------
+    start_method: str
+        One of :attr:`START_METHODS`. If None, the platform default is used
+    preload: str
+        The module to import in the fork server, if the `start_method` is
+        ``'forkserver'``
+
+    Notes
+    -----
+    The context is only created once per `start_method` because the modules
+    for the fork server can only be set before it starts"""
+    import multiprocessing as mp
+    if start_method is not None:
+        check_start_method(start_method)
+    ctx = mp.get_context(start_method)
+    if ctx.get_start_method() != 'fork':
+        logger.warning(
+            "The %r start method does not pass the logging configuration to "
+            "the worker processes! Their log messages might be lost.",
+            ctx.get_start_method())
+    if ctx.get_start_method() == 'forkserver' and preload:
+        ctx.set_forkserver_preload([preload])
+    return ctx
+
+
+def _init_setup_worker(manager, db_locks, file_locks):
+    """Initialize a worker process of :meth:`TaskManager._setup_parallel`
+
+    The `manager` is sent only once to each worker, such that the tasks of
+    the pool only have to contain the stations"""
+    global _worker_manager
+    _worker_manager = manager
+    init_locks(db_locks, file_locks)
+
+
+def _setup_worker(t):
+    """Set up the tasks of the manager in a worker process
+
+    Parameters
+    ----------
+    t: tuple
+        The index `i` and the arguments for :meth:`TaskManager._setup`
+
+    Returns
+    -------
+    int
+        The index `i`
+    list
+        The result of :meth:`TaskManager._setup`"""
+    i, args = t
+    return i, _worker_manager._setup(*args)
+
+
+def cpu_count():
+    """Get the number of CPUs that this process may use
+
+    Other than :func:`multiprocessing.cpu_count`, this function respects
+    the CPU affinity of the process (e.g. restrictions through cpusets or
+    the batch system) where the platform supports it
+
+    Returns
+    -------
+    int
+        The number of usable CPUs"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        import multiprocessing as mp
+        return mp.cpu_count()
+
 
 def enhanced_config(config_cls, name):
     ret = namedtuple(name, config_cls._fields + TaskConfig._fields)
@@ -507,8 +616,7 @@ def enhanced_config(config_cls, name):
         """.format(config_cls.__name__)), name))
 
 
-@six.add_metaclass(TaskMeta)
-class TaskBase(object):
+class TaskBase(object, metaclass=TaskMeta):
     """Abstract base class for parameterization and evaluation tasks
 
     Abstract base class that introduces the methods for the parameterization
@@ -718,7 +826,7 @@ class TaskBase(object):
         """str. The path to the csv file where the data is stored by the
         :meth:`Parameterizer.write2file` method and read by the
         :meth:`Parameterizer.setup_from_file`"""
-        if isinstance(self._datafile, six.string_types):
+        if isinstance(self._datafile, str):
             return osp.join(self.task_data_dir, self._datafile)
         else:
             return list(map(lambda f: osp.join(self.task_data_dir, f),
@@ -782,7 +890,7 @@ class TaskBase(object):
 
     @logger.setter
     def logger(self, value):
-        if isinstance(value, six.string_types):
+        if isinstance(value, str):
             value = logging.getLogger(value)
         elif value is None and not self.global_config.get('serial'):
             import multiprocessing as mp
@@ -845,9 +953,10 @@ class TaskBase(object):
                     kwargs[key] = getattr(self.default_config, key, None)
             self.task_config = self.default_config._replace(**kwargs)
         self.stations = stations
-        # overwrite the class attribute of the formatoptions
+        # overwrite the class attributes of the formatoptions and threads
         self.fmt = self.fmt.copy()
-        if data is not None or isinstance(self._datafile, six.string_types):
+        self.threads = []
+        if data is not None or isinstance(self._datafile, str):
             self.data = data
         else:
             self.data = [[] for i in range(len(self._datafile))]
@@ -857,9 +966,9 @@ class TaskBase(object):
 
         if self.task_config.remove:
             for datafile in safe_list(self.datafile):
-                if osp.exists(datafile):
-                    self.logger.debug('Removing %s', datafile)
+                with suppress(FileNotFoundError):
                     os.remove(datafile)
+                    self.logger.debug('Removed %s', datafile)
 
     def __reduce__(self):
         if 'remove' in self.task_config._fields:
@@ -1020,7 +1129,7 @@ class TaskBase(object):
         -------
         list of dict
             The splitted `kws`"""
-        if isinstance(self._datafile, six.string_types):
+        if isinstance(self._datafile, str):
             return [kws]
         return [{key: val[i] for key, val in kws.items()}
                 for i in range(len(self._datafile))]
@@ -1033,7 +1142,7 @@ class TaskBase(object):
         i: int
             The integer position where to set the data. If the
             :attr:`_datafile` attribute is a string, `i` will be ignored."""
-        if isinstance(self._datafile, six.string_types):
+        if isinstance(self._datafile, str):
             return self.data
         return self.data[i]
 
@@ -1047,7 +1156,7 @@ class TaskBase(object):
         i: int
             The integer position where to set the data. If the
             :attr:`_datafile` attribute is a string, `i` will be ignored."""
-        if isinstance(self._datafile, six.string_types):
+        if isinstance(self._datafile, str):
             self.data = data
         else:
             self.data[i] = data
@@ -1117,7 +1226,7 @@ class TaskBase(object):
         else:
             obj = base
         obj.logger.debug('Setting up from %i instances', len(instances))
-        if isinstance(cls._datafile, six.string_types):
+        if isinstance(cls._datafile, str):
             data = pd.concat([ini.data for ini in instances])
         else:
             data = [pd.concat([ini.data[i] for ini in instances])
@@ -1179,7 +1288,7 @@ class TaskBase(object):
             self.logger.debug('    Saving project to %s', project_output)
             if nc_output is not None:
                 for f in safe_list(nc_output):
-                    if osp.exists(f):
+                    with suppress(FileNotFoundError):
                         os.remove(f)
                 save_kws = dict(use_rel_paths=True, paths=safe_list(nc_output))
             else:  # save the entire dataset into the pickle file
@@ -1297,8 +1406,8 @@ class TaskBase(object):
         return parser, setup_grp, run_grp
 
     def get_run_kws(self, kwargs):
-        return {key: val for key, val in kwargs.items()
-                if key in inspect.getargspec(self.run)[0]}
+        names = get_arg_names(type(self).run)
+        return {key: val for key, val in kwargs.items() if key in names}
 
     def write2db(self, **kwargs):
         """Write the data from this task to the database given by the
@@ -1365,6 +1474,35 @@ class TaskBase(object):
         tasks"""
         return TaskManager(cls, *args, **kwargs)
 
+    #: dict. Mapping from a task class to the number of registered tasks and
+    #: the result of :meth:`get_sorted_tasks`
+    _sorted_tasks = {}
+
+    @classmethod
+    def get_sorted_tasks(cls):
+        """
+        Get the unique tasks of the registry sorted by their requirements
+
+        The result is cached and only recomputed when new tasks have been
+        registered
+
+        Returns
+        -------
+        tuple of :class:`TaskBase` subclasses
+            The tasks of the :attr:`_registry` (the latest registered task
+            for each name) sorted by :meth:`TaskManager.sort_by_requirement`"""
+        registry = cls._registry
+        try:
+            nregistered, ret = TaskBase._sorted_tasks[cls]
+        except KeyError:
+            nregistered = None
+        if nregistered != len(registry):
+            ret = tuple(unique_everseen(
+                TaskManager.sort_by_requirement(registry[::-1]),
+                lambda t: t.name))
+            TaskBase._sorted_tasks[cls] = (len(registry), ret)
+        return ret
+
 
 class TaskManager(object):
     """A manager to run the tasks within a task framework"""
@@ -1377,6 +1515,13 @@ class TaskManager(object):
 
     _logger = None
 
+    #: dict. Mapping from task name to the task class in the registry of the
+    #: :attr:`base_task`. Created by :meth:`get_task_cls`
+    _task_classes = None
+
+    #: int. The size of the registry when :attr:`_task_classes` was created
+    _nregistered = 0
+
     @property
     def logger(self):
         """The logger of this task"""
@@ -1386,7 +1531,7 @@ class TaskManager(object):
 
     @logger.setter
     def logger(self, value):
-        if isinstance(value, six.string_types):
+        if isinstance(value, str):
             value = logging.getLogger(value)
         elif value is None and not self.config.get('serial'):
             import multiprocessing as mp
@@ -1519,11 +1664,15 @@ class TaskManager(object):
         -------
         TaskBase
             The class of the requested task"""
+        registry = self.base_task._registry
+        # (re)build the lookup if new tasks have been registered
+        if self._task_classes is None or self._nregistered != len(registry):
+            self._task_classes = {task_cls.name: task_cls
+                                  for task_cls in registry}
+            self._nregistered = len(registry)
         try:
-            return next(
-                task_cls for task_cls in self.base_task._registry[::-1]
-                if task_cls.name == identifier)
-        except StopIteration:
+            return self._task_classes[identifier]
+        except KeyError:
             raise KeyError('Unkown task {}'.format(identifier))
 
     def get_requirements(self, identifier, all_requirements=True):
@@ -1631,63 +1780,63 @@ class TaskManager(object):
             lock_dir = mkdtemp(prefix='tmp_gwgen_locks_')
             logger.debug('Temporary lock directory: %s', lock_dir)
         else:
-            import multiprocessing as mp
+            # the start method of the worker processes. With 'forkserver' or
+            # 'spawn' the workers do not inherit the memory of this process
+            # but have to import the task module themselves
+            ctx = _get_mp_context(config.get('start_method'),
+                                  self.base_task.__module__)
+        # read the configuration once for all groups of tasks
+        all_nprocs = config.get('nprocs', 'all')
+        if all_nprocs == 'all':
+            if scheduler is not None:
+                all_nprocs = len(client.ncores().values())
+            else:
+                all_nprocs = cpu_count()
+        config_max_stations = config.get('max_stations', 500)
         all_tasks = self.tasks
-        grouped = [(key, list(tasks)) for key, tasks in groupby(
-                       all_tasks, lambda task: task.setup_parallel)]
+        # group consecutive tasks by whether they can be set up in parallel
+        grouped = []
+        for task in all_tasks:
+            key = task.setup_parallel
+            if grouped and grouped[-1][0] == key:
+                grouped[-1][1].append(task)
+            else:
+                grouped.append((key, [task]))
         ret_tasks = []
         orig_stations = stations
         for i, (key, tasks) in enumerate(grouped):
             self.tasks = tasks
             if key:
                 logger.info('Processing %s tasks in parallel', len(tasks))
-                # initialize pool
-                nprocs = config.get('nprocs', 'all')
-                if nprocs == 'all':
-                    if scheduler is not None:
-                        nprocs = len(client.ncores().values())
-                    else:
-                        nprocs = mp.cpu_count()
                 # split up the stations for the workers
-                max_stations = min(int(np.ceil(len(orig_stations) / nprocs)),
-                                   config.get('max_stations', 500))
-                if len(orig_stations) > max_stations:
-                    stations = np.split(orig_stations, np.arange(
-                        max_stations, len(stations), max_stations, dtype=int))
-                else:
-                    stations = [orig_stations]
-                # The real number of stations list. It might happen that we
-                # have more processors than stations which then results in
-                # empty arrays in `stations`
-                nstations_lists = next((i for i, l in enumerate(stations)
-                                        if len(l) == 0), len(stations))
-                # make sure we don't send a list of empty stations to a process
-                stations = stations[:nstations_lists]
-                nprocs = min(nprocs, nstations_lists)
+                nprocs = all_nprocs
+                nstations = len(orig_stations)
+                max_stations = max(1, min(-(-nstations // nprocs),
+                                          config_max_stations))
+                stations = [orig_stations[start:start + max_stations]
+                            for start in range(0, nstations, max_stations)]
+                # without any station, we still set up the tasks once with
+                # the empty station list (as in the serial processing)
+                stations = stations or [orig_stations]
+                # make sure we don't start more processes than we have
+                # station lists
+                nprocs = max(1, min(nprocs, len(stations)))
                 if scheduler is None:
                     # create locks
                     for task in self.tasks:
                         for fname in safe_list(task.datafile):
-                            _file_locks[fname] = mp.Lock()
+                            _file_locks[fname] = ctx.Lock()
                         for dbname in safe_list(task.dbname):
-                            _db_locks[dbname] = mp.Lock()
-                    # start the pool
-                    logger.debug(
-                        'Starting %s processes for %s station lists',
-                        nprocs, len(stations))
-                    pool = mp.Pool(nprocs, initializer=init_locks,
-                                   initargs=(_db_locks, _file_locks))
-                else:
-                    file_locks = list(chain(*(
-                        safe_list(task.datafile) for task in self.tasks)))
-                    db_locks = list(chain(*(
-                        safe_list(task.datafile) for task in self.tasks)))
-                if i != len(grouped):
-                    unsafe = list(chain(*grouped[i+1::2]))
-                    _to_return = to_return + list(chain(*(
-                        t.setup_requires for t in chain(*unsafe[1::2]))))
+                            _db_locks[dbname] = ctx.Lock()
                 else:
-                    _to_return = to_return
+                    file_locks = list(chain.from_iterable(
+                        safe_list(task.datafile) for task in self.tasks))
+                    db_locks = list(chain.from_iterable(
+                        safe_list(task.datafile) for task in self.tasks))
+                # keep the requirements of the following serial tasks
+                _to_return = to_return + [
+                    name for _, unsafe in grouped[i+1::2] for t in unsafe
+                    for name in t.setup_requires]
                 args = [[s, _to_return, True] for s in stations]
                 # start the computation
                 if scheduler is not None:
@@ -1700,11 +1849,25 @@ class TaskManager(object):
                     res = client.map(self, args, pure=False, **kws)
                     tasks = client.gather(res)
                 else:
-                    res = pool.map_async(self, args)
-                    tasks = res.get()
-                    pool.close()
-                    pool.join()
-                    pool.terminate()
+                    logger.debug(
+                        'Starting %s processes for %s station lists',
+                        nprocs, len(stations))
+                    # collect the results as soon as they are finished but
+                    # keep the order of the station lists
+                    tasks = [None] * len(args)
+                    chunksize = max(1, len(args) // (nprocs + 2))
+                    # the pool is terminated when leaving the context, even
+                    # if one of the workers fails
+                    with ctx.Pool(
+                            nprocs, initializer=_init_setup_worker,
+                            initargs=(self, _db_locks, _file_locks),
+                            maxtasksperchild=config.get('maxtasksperchild')
+                            ) as pool:
+                        for j, proc_tasks in pool.imap_unordered(
+                                _setup_worker, enumerate(args), chunksize):
+                            tasks[j] = proc_tasks
+                        pool.close()
+                        pool.join()
                 tasks = [
                     task.setup_from_instances(
                         next(t for t in all_tasks if t.name == task.name),
@@ -1725,8 +1888,6 @@ class TaskManager(object):
     def __call__(self, t):
         return self._setup(*t)
 
-    docstrings.keep_params('TaskBase.parameters', 'stations')
-
     @docstrings.dedent
     def _setup(self, stations, to_return=None, copy_tasks=False,
                file_locks=None, db_locks=None, lock_dir=None):
@@ -1767,19 +1928,20 @@ class TaskManager(object):
         for task in self.tasks:
             for thread in task.threads:
                 thread.join()
-        ret = list(filter(lambda ini: ini.name in to_return, self.tasks))
+            task.threads.clear()
+        ret = [task for task in self.tasks if task.name in to_return]
         if copy_tasks:
             # copy the instance in order to avoid complications with
             # parallel processing
             for i, task in enumerate(ret[:]):
                 ret[i] = copy.copy(task)
-            for task in filter(lambda ini: ini.name not in to_return,
-                               self.tasks):
-                del task.data
+            for task in self.tasks:
+                if task.name not in to_return:
+                    del task.data
         return ret
 
     def run(self, full_info, *args):
         for task in self.tasks:
             if task.has_run:
-                full_info[task.name] = info = OrderedDict()
+                full_info[task.name] = info = {}
                 task.run(info, *args)
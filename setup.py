@@ -60,8 +60,7 @@ def configuration(parent_package='', top_path=None):
     return config
 
 install_requires = ['f90nml', 'psyplot', 'scipy', 'sqlalchemy', 'psycopg2',
-                    'statsmodels', 'docrep', 'model-organization', 'xarray',
-                    'six']
+                    'statsmodels', 'docrep', 'model-organization', 'xarray']
 
 
 setup(name='gwgen',
@@ -76,8 +75,6 @@ setup(name='gwgen',
         'Topic :: Scientific/Engineering :: Physics',
         'Topic :: Scientific/Engineering',
         'License :: OSI Approved :: GNU General Public License v2 (GPLv2)',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.2',
         'Programming Language :: Python :: 3.3',
@@ -1,6 +1,5 @@
 import os
 import os.path as osp
-import six
 import shutil
 import unittest
 import glob
@@ -141,12 +140,8 @@ class BaseTest(unittest.TestCase):
 
     @staticmethod
     def _test_url(url, *args, **kwargs):
-        if six.PY3:
-            from urllib import request
-            request.urlopen(url, *args, **kwargs)
-        else:
-            import urllib
-            urllib.urlopen(url, *args, **kwargs)
+        from urllib import request
+        request.urlopen(url, *args, **kwargs)
 
     def assertAlmostArrayEqual(self, actual, desired, rtol=1e-07, atol=0,
                                msg=None, **kwargs):
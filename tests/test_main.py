@@ -17,6 +17,17 @@ class OrganizerTest(bt.BaseTest):
         self.assertTrue(osp.exists(binpath),
                         msg='binary %s does not exist!' % binpath)
 
+    def test_configure_parallel(self):
+        """Test the configuration of the parallel setup"""
+        gconf = self.organizer.config.global_config
+        self.organizer.configure(global_config=True, start_method='spawn',
+                                 maxtasksperchild=2)
+        self.assertEqual(gconf['start_method'], 'spawn')
+        self.assertEqual(gconf['maxtasksperchild'], 2)
+        with self.assertRaisesRegex(ValueError, 'start method'):
+            self.organizer.configure(global_config=True, start_method='thread')
+        self.assertEqual(gconf['start_method'], 'spawn')
+
     def test_run(self):
         self._test_init()
         organizer = self.organizer
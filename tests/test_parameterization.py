@@ -9,7 +9,7 @@ import shutil
 import numpy as np
 import pandas as pd
 # we use assert_frame_equal instead of pd.equal, because it is less strict
-from pandas.util.testing import assert_frame_equal
+from pandas.testing import assert_frame_equal
 import _base_testing as bt
 import gwgen.parameterization as param
 import gwgen.utils as utils
@@ -60,7 +60,7 @@ class _ParameterizerTestMixin(object):
             return [task.data]
 
         def no_duplicates(df):
-            return df.ix[~df.index.duplicated(keep=False)]
+            return df[~df.index.duplicated(keep=False)]
 
         if self.param_cls is None:
             return
@@ -132,8 +132,8 @@ class _ParameterizerTestMixin(object):
                 df_ref = no_duplicates(df_ref)
                 mask = (df != df_ref).values.any(axis=1)
                 self.assertIsNone(df_equals(df, df_ref, check_dtype=False),
-                                  msg=df_diff_msg % (df.ix[mask],
-                                                     df_ref.ix[mask]))
+                                  msg=df_diff_msg % (df[mask],
+                                                     df_ref[mask]))
         # check setup from db
         if setup_from_db:
             for fname in filter(None, safe_list(task.datafile)):
@@ -155,8 +155,8 @@ class _ParameterizerTestMixin(object):
                 df_ref = no_duplicates(df_ref)
                 mask = (df != df_ref).values.any(axis=1)
                 self.assertIsNone(df_equals(df, df_ref, check_dtype=False),
-                                  msg=df_diff_msg % (df.ix[mask],
-                                                     df_ref.ix[mask]))
+                                  msg=df_diff_msg % (df[mask],
+                                                     df_ref[mask]))
         return manager
 
 # the usage of distributed is not supported at the moment
@@ -191,6 +191,17 @@ class Test_DailyGHCNData(bt.BaseTest, _ParameterizerTestMixin):
         self._test_url(src.format(self.stations[0]) + '.dly')
         self.assert_(True)
 
+    def test_remove_old_caches(self):
+        """Test whether a new cache replaces the one of the same stations"""
+        cache_dir = osp.join(self.test_dir, 'ghcn_daily_cache')
+        os.makedirs(cache_dir)
+        fnames = ['a_1.pkl', 'a_2.pkl', 'b_1.pkl', 'a_1.pkl.123.tmp']
+        for fname in fnames:
+            open(osp.join(cache_dir, fname), 'w').close()
+        param.DailyGHCNData._remove_old_caches(osp.join(cache_dir, 'a_2.pkl'))
+        self.assertEqual(sorted(os.listdir(cache_dir)),
+                         ['a_1.pkl.123.tmp', 'a_2.pkl', 'b_1.pkl'])
+
 
 class Test_CompleteDailyGHCNData(bt.BaseTest, _ParameterizerTestMixin):
     """Test case for the :class:`gwgen.parameterization.CompleteDailyGHCNData`
@@ -205,7 +216,7 @@ class Test_CompleteDailyGHCNData(bt.BaseTest, _ParameterizerTestMixin):
         monthly['day'] = 1
         s = pd.to_datetime(monthly.reset_index()[['year', 'month', 'day']])
         s.index = monthly.index
-        monthly['ndays'] = ((s + pd.datetools.thisMonthEnd) - s).dt.days + 1
+        monthly['ndays'] = s.dt.days_in_month
         difference = monthly['prcp'] != monthly['ndays']
         self.assertTrue(
             (monthly['prcp'] == monthly['ndays']).all(),
@@ -241,6 +252,30 @@ class Test_MonthlyGHCNData(bt.BaseTest, _ParameterizerTestMixin):
 
     param_cls = param.MonthlyGHCNData
 
+    def test_monthly_summary(self):
+        """Test the summary of single months against the vectorized version
+        """
+        dates = pd.date_range('1999-12-20', '2000-03-10')
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat('id', len(dates)), dates.year, dates.month, dates.day],
+            names=['id', 'year', 'month', 'day'])
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({'tmin': rng.rand(len(dates)),
+                           'tmax': rng.rand(len(dates)) + 1.,
+                           'prcp': rng.rand(len(dates)) - 0.5},
+                          index=index)
+        df.loc[df.prcp < 0, 'prcp'] = 0.
+        df.iloc[::7, 2] = np.nan
+        ref = df.groupby(level=['id', 'year', 'month']).apply(
+            self.param_cls.monthly_summary)
+        ref.index = ref.index.droplevel(-1)
+        ret = self.param_cls._monthly_summaries(df)
+        self.assertIsNone(df_equals(ret, ref, check_dtype=False))
+        self.assertEqual(ret.prcp_complete.tolist(),
+                         [False, False, False, False])
+        self.assertEqual(ret.tmin_complete.tolist(),
+                         [False, True, True, False])
+
 
 class Test_CompleteMonthlyGHCNData(bt.BaseTest, _ParameterizerTestMixin):
     """Test case for the
@@ -261,6 +296,62 @@ class Test_TemperatureParameterizer(bt.BaseTest, _ParameterizerTestMixin):
 
     param_cls = param.TemperatureParameterizer
 
+    def test_calc_monthly_props(self):
+        """Test the gamma parameters of a single month"""
+        df = pd.DataFrame({'prcp': [0., 1., 4., 0.],
+                           'tmin': [1., 2., 3., 4.],
+                           'tmax': [5., 7., 9., 11.]})
+        ret = self.param_cls.calc_monthly_props(df)
+        self.assertEqual(len(ret), 1)
+        self.assertAlmostEqual(ret['prcp_wet'][0], 2.5)
+        self.assertAlmostEqual(ret['alpha'][0], 2.393843, places=6)
+        self.assertAlmostEqual(ret['beta'][0], 1.044346, places=6)
+        # equal arithmetic and geometric mean
+        df['prcp'] = [0., 2., 2., 0.]
+        ret = self.param_cls.calc_monthly_props(df)
+        self.assertEqual(len(ret), 1)
+        self.assertTrue(ret.isnull().values.all())
+
+    def test_trange(self):
+        """Test the temperature range on wet and dry days"""
+        df = pd.DataFrame({'prcp': [0., 1., 4., 0.],
+                           'tmin': [1., 2., 3., 4.],
+                           'tmax': [5., 7., 9., 11.]},
+                          index=pd.MultiIndex.from_tuples(
+                              [('id', 2000, 1, day) for day in range(1, 5)],
+                              names=['id', 'year', 'month', 'day']))
+        for ret in [self.param_cls.calc_monthly_props(df).iloc[0],
+                    self.param_cls.calc_all_monthly_props(df).iloc[0]]:
+            self.assertAlmostEqual(ret['trange_wet'], 5.5)
+            self.assertAlmostEqual(ret['trangestddev_wet'], 0.5)
+            self.assertAlmostEqual(ret['trange_dry'], 5.5)
+            self.assertAlmostEqual(ret['trangestddev_dry'], 1.5)
+
+    def test_monthly_props_kernel(self):
+        """Test the kernel for the monthly statistics against pandas"""
+        dates = pd.date_range('2000-01-01', '2000-06-30')
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat('id', len(dates)), dates.year, dates.month, dates.day],
+            names=['id', 'year', 'month', 'day'])
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame({'prcp': rng.rand(len(dates)) * 10 - 5,
+                           'tmin': rng.rand(len(dates)) * 10,
+                           'tmax': rng.rand(len(dates)) * 10 + 10},
+                          index=index)
+        df.loc[df.prcp < 0, 'prcp'] = 0.
+        df.loc[dates.month == 3, 'prcp'] = 0.  # no wet day
+        df.loc[dates.month == 4, 'prcp'] = 2.  # constant precipitation
+        df.iloc[::11, 1] = np.nan  # missing temperatures
+        starts = param._group_starts(index, ['id', 'year', 'month'])
+        ret = pd.DataFrame(
+            param._monthly_temperature_props(
+                *[param._kernel_array(df[col].values)
+                  for col in ['prcp', 'tmin', 'tmax']], starts=starts),
+            columns=param._temperature_props)
+        ref = self.param_cls.calc_all_monthly_props(df).reset_index(
+            drop=True)[param._temperature_props]
+        self.assertIsNone(df_equals(ret, ref))
+
 
 class _CloudTestMixin(object):
     """A base class defining a test for using eecra stations directly"""
@@ -283,6 +374,13 @@ class Test_HourlyCloud(bt.BaseTest, _ParameterizerTestMixin, _CloudTestMixin):
         for key, url in self.param_cls.urls.items():
             self._test_url(url)
 
+    def test_filter_stations(self):
+        """Test the selection of GHCN stations with EECRA data"""
+        stations = ['AE000041196', 'missing', 'ACW00011604', 'AE000041196']
+        self.assertEqual(
+            list(self.param_cls.filter_stations(stations)),
+            ['AE000041196', 'ACW00011604', 'AE000041196'])
+
     def test_extraction(self):
         self._test_init()
         orig_data = self.organizer.project_config['data']
@@ -352,7 +450,7 @@ class Test_CompleteDailyCloud(bt.BaseTest, _ParameterizerTestMixin,
         monthly['day'] = 1
         s = pd.to_datetime(monthly.reset_index()[['year', 'month', 'day']])
         s.index = monthly.index
-        monthly['ndays'] = ((s + pd.datetools.thisMonthEnd) - s).dt.days + 1
+        monthly['ndays'] = s.dt.days_in_month
         difference = monthly['mean_cloud'] != monthly['ndays']
         self.assertTrue(
             (monthly['mean_cloud'] == monthly['ndays']).all(),
@@ -421,6 +519,45 @@ class Test_CrossCorrelation(bt.BaseTest, _ParameterizerTestMixin):
 
     param_cls = param.CrossCorrelation
 
+    def test_pairwise_corr(self):
+        """Test the correlation of the variables with the previous day"""
+        x = np.random.RandomState(0).rand(50, 3)
+        x[[3, 10, 20], [0, 1, 1]] = np.nan
+        y = np.r_[x[:1], x[:-1]]
+        df = pd.DataFrame(x)
+        shifted = pd.DataFrame(y)
+        ret = param._pairwise_corr(x, y)
+        self.assertEqual(ret.shape, (3, 3))
+        for i, j in np.ndindex(ret.shape):
+            self.assertAlmostEqual(ret[i, j], df[i].corr(shifted[j]))
+
+    def test_calculate_correlations(self):
+        """Test the layout of the correlations with the previous day"""
+        dates = pd.date_range('2000-01-01', '2000-06-30')
+        n = len(dates)
+        index = pd.MultiIndex.from_arrays(
+            [np.repeat(['id1', 'id2'], n), np.tile(dates.year, 2),
+             np.tile(dates.month, 2), np.tile(dates.day, 2)],
+            names=['id', 'year', 'month', 'day'])
+        cols = ['tmin', 'tmax', 'mean_cloud']
+        df = pd.DataFrame(np.random.RandomState(0).rand(2 * n, 3),
+                          index=index, columns=cols)
+        # tmax depends on tmin of the previous day
+        df['tmax'] += 3 * df['tmin'].groupby(level='id').shift(1).fillna(0)
+        # the first day of each station is missing, such that the
+        # boundaries between the stations do not matter
+        df.iloc[[0, n]] = np.nan
+        data = self.param_cls.calculate_correlations(df, cols)
+        shifted = df.groupby(level='id').shift(1)
+        for r in cols:
+            for c in cols:
+                self.assertAlmostEqual(data.loc[r, c + '1'],
+                                       df[c].corr(shifted[r]),
+                                       msg='%s, %s' % (r, c + '1'))
+        # the correlation of tmax with tmin of the previous day is high
+        self.assertGreater(data.loc['tmin', 'tmax1'], 0.5)
+        self.assertLess(abs(data.loc['tmax', 'tmin1']), 0.5)
+
 
 if __name__ == '__main__':
     unittest.main()